@@ -0,0 +1,52 @@
+"""users updated_at for conditional GETs
+
+Revision ID: 9c3d5e7f1a24
+Revises: e2f8a4c61b07
+Create Date: 2026-10-18 14:22:41.508113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c3d5e7f1a24'
+down_revision: Union[str, Sequence[str], None] = 'e2f8a4c61b07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # now() is evaluated once for the statement, so existing rows get the
+    # migration time without a table rewrite.
+    op.add_column(
+        'users',
+        sa.Column(
+            'updated_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.text('now()'),
+            nullable=False,
+        ),
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_users_updated_at'),
+            'users',
+            ['updated_at'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            op.f('ix_users_updated_at'),
+            table_name='users',
+            postgresql_concurrently=True,
+        )
+    op.drop_column('users', 'updated_at')
@@ -0,0 +1,53 @@
+"""users and otp index overhaul
+
+Revision ID: b4e1c7a92d35
+Revises: 6dd8e84b1cc3
+Create Date: 2026-10-18 10:12:41.503117
+
+Drops the ix_users_id / ix_otp_id indexes that duplicated the primary keys,
+and replaces the case-sensitive users.email unique constraint with a unique
+lower(email) index. The index is built CONCURRENTLY so writes are not
+blocked; it fails if existing emails already collide when lowercased, and
+those rows have to be merged first.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4e1c7a92d35'
+down_revision: Union[str, Sequence[str], None] = '6dd8e84b1cc3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'uq_users_email_lower',
+            'users',
+            [sa.text('lower(email)')],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+        op.drop_index('ix_users_id', table_name='users', postgresql_concurrently=True)
+        op.drop_index('ix_otp_id', table_name='otp', postgresql_concurrently=True)
+    op.drop_constraint('users_email_key', 'users', type_='unique')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_unique_constraint('users_email_key', 'users', ['email'])
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_otp_id', 'otp', ['id'], unique=False, postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_users_id', 'users', ['id'], unique=False, postgresql_concurrently=True
+        )
+        op.drop_index(
+            'uq_users_email_lower', table_name='users', postgresql_concurrently=True
+        )
@@ -0,0 +1,37 @@
+"""otp expiry index for the sweeper
+
+Revision ID: e2f8a4c61b07
+Revises: b4e1c7a92d35
+Create Date: 2026-10-18 11:03:27.214690
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2f8a4c61b07'
+down_revision: Union[str, Sequence[str], None] = 'b4e1c7a92d35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_otp_otp_expiry'),
+            'otp',
+            ['otp_expiry'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            op.f('ix_otp_otp_expiry'), table_name='otp', postgresql_concurrently=True
+        )
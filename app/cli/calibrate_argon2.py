@@ -0,0 +1,91 @@
+"""Pick argon2 costs for this host from a verify-latency target and memory budget.
+
+Memory is the main defence against GPU cracking, so the full budget is used
+first and halved only when even a single pass is slower than the target.
+Time cost is then raised while verification stays within the target.
+
+    python -m app.cli.calibrate_argon2 --target-ms 250 --max-memory-mib 64
+
+Prints ARGON2_* lines ready for the env file. Changing them is safe: stored
+hashes are upgraded the next time each user logs in.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+MIN_MEMORY_KIB = 8 * 1024
+SAMPLE_PASSWORD = "correct horse battery staple"
+
+
+def measure(time_cost: int, memory_cost: int, parallelism: int, samples: int) -> float:
+    hasher = Argon2Hasher(
+        time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism
+    )
+    hashed = hasher.hash(SAMPLE_PASSWORD)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.verify(SAMPLE_PASSWORD, hashed)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def calibrate(
+    target: float, max_memory_kib: int, parallelism: int, samples: int
+) -> dict:
+    memory_cost = max_memory_kib
+    latency = measure(1, memory_cost, parallelism, samples)
+    while latency > target and memory_cost // 2 >= MIN_MEMORY_KIB:
+        memory_cost //= 2
+        latency = measure(1, memory_cost, parallelism, samples)
+
+    time_cost = 1
+    while True:
+        candidate = measure(time_cost + 1, memory_cost, parallelism, samples)
+        if candidate > target:
+            break
+        time_cost += 1
+        latency = candidate
+
+    return {
+        "time_cost": time_cost,
+        "memory_cost": memory_cost,
+        "parallelism": parallelism,
+        "verify_ms": round(latency * 1000, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target-ms", type=float, default=250.0)
+    parser.add_argument("--max-memory-mib", type=int, default=64)
+    parser.add_argument("--parallelism", type=int, default=min(os.cpu_count() or 1, 4))
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print JSON instead")
+    args = parser.parse_args()
+
+    result = calibrate(
+        target=args.target_ms / 1000,
+        max_memory_kib=args.max_memory_mib * 1024,
+        parallelism=args.parallelism,
+        samples=args.samples,
+    )
+    if args.json:
+        print(json.dumps(result))
+        return
+    print(f"ARGON2_TIME_COST={result['time_cost']}")
+    print(f"ARGON2_MEMORY_COST={result['memory_cost']}")
+    print(f"ARGON2_PARALLELISM={result['parallelism']}")
+    print(
+        f"# verify takes ~{result['verify_ms']} ms on this host "
+        f"(target {args.target_ms:g} ms, budget {args.max_memory_mib} MiB)"
+    )
+
+
+if __name__ == "__main__":
+    main()
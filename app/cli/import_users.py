@@ -0,0 +1,214 @@
+"""Bulk-load users from CSV or NDJSON.
+
+Passwords are hashed across all cores, rows are streamed into a temporary
+staging table with COPY, and a single INSERT ... SELECT moves them into
+``users``. Rows whose email already exists, or repeats an earlier line of the
+same file, are skipped and reported instead of aborting the load.
+
+    python -m app.cli.import_users customers.csv --conflicts-out conflicts.csv
+
+Input columns: first_name, last_name, email, password.
+"""
+
+import argparse
+import csv
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator
+
+from pydantic import ValidationError
+
+from app.database.db import get_engine
+from app.schemas.request import RegisterUserSchema
+from app.utils.hashing import hash_passwords
+
+STAGING_TABLE = "users_import"
+
+CREATE_STAGING = f"""
+CREATE TEMP TABLE {STAGING_TABLE} (
+    line integer NOT NULL,
+    first_name text NOT NULL,
+    last_name text NOT NULL,
+    email text NOT NULL,
+    hashed_password text NOT NULL
+)
+"""
+
+COPY_STAGING = (
+    f"COPY {STAGING_TABLE} (line, first_name, last_name, email, hashed_password) "
+    "FROM STDIN WITH (FORMAT csv)"
+)
+
+# The first line for each email (ignoring case, like uq_users_email_lower)
+# wins; every other staged row is returned with the reason it was skipped.
+MERGE_STAGING = f"""
+WITH ranked AS (
+    SELECT *, row_number() OVER (PARTITION BY lower(email) ORDER BY line) AS rn
+    FROM {STAGING_TABLE}
+), inserted AS (
+    INSERT INTO users (
+        first_name, last_name, email, hashed_password,
+        is_email_verified, token_version, is_active, is_deleted, created_at,
+        updated_at
+    )
+    SELECT first_name, last_name, email, hashed_password,
+           %(verified)s, 0, true, false, now(), now()
+    FROM ranked
+    WHERE rn = 1
+    ON CONFLICT ((lower(email))) DO NOTHING
+    RETURNING lower(email) AS email_key
+)
+SELECT r.line, r.email,
+       CASE WHEN r.rn > 1 THEN 'duplicate_in_file' ELSE 'already_exists' END
+FROM ranked r
+WHERE r.rn > 1
+   OR NOT EXISTS (SELECT 1 FROM inserted i WHERE i.email_key = lower(r.email))
+ORDER BY r.line
+"""
+
+
+@dataclass
+class ImportReport:
+    read: int = 0
+    inserted: int = 0
+    invalid: list[tuple[int, str]] = field(default_factory=list)
+    conflicts: list[tuple[int, str, str]] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.inserted / self.seconds if self.seconds else 0.0
+
+
+def read_rows(path: str, fmt: str | None = None) -> Iterator[tuple[int, dict]]:
+    fmt = fmt or ("ndjson" if path.endswith((".ndjson", ".jsonl")) else "csv")
+    with open(path, newline="", encoding="utf-8") as source:
+        if fmt == "csv":
+            # Line 1 is the header row.
+            for line, row in enumerate(csv.DictReader(source), start=2):
+                yield line, row
+        else:
+            for line, raw in enumerate(source, start=1):
+                if raw.strip():
+                    yield line, json.loads(raw)
+
+
+def _batches(rows: Iterable, size: int) -> Iterator[list]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def import_users(
+    rows: Iterable[tuple[int, dict]],
+    connection,
+    workers: int | None = None,
+    batch_size: int = 5000,
+    verified: bool = False,
+) -> ImportReport:
+    """Stage and merge ``rows`` using a raw psycopg2 ``connection``.
+
+    The caller owns the transaction: nothing is committed here.
+    """
+    report = ImportReport()
+    start = time.perf_counter()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    pool = (
+        multiprocessing.get_context("spawn").Pool(processes=workers)
+        if workers > 0
+        else None
+    )
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(CREATE_STAGING)
+            for batch in _batches(rows, batch_size):
+                valid = []
+                for line, row in batch:
+                    report.read += 1
+                    try:
+                        valid.append((line, RegisterUserSchema.model_validate(row)))
+                    except ValidationError as exc:
+                        report.invalid.append((line, str(exc.errors()[0]["msg"])))
+                passwords = [user.password for _, user in valid]
+                hashes = hash_passwords(
+                    passwords,
+                    pool,
+                    chunksize=max(len(passwords) // (max(workers, 1) * 4), 1),
+                )
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                for (line, user), hashed in zip(valid, hashes):
+                    writer.writerow(
+                        (line, user.first_name, user.last_name, user.email, hashed)
+                    )
+                buffer.seek(0)
+                cursor.copy_expert(COPY_STAGING, buffer)
+            cursor.execute(MERGE_STAGING, {"verified": verified})
+            report.conflicts = [tuple(row) for row in cursor.fetchall()]
+            cursor.execute(f"DROP TABLE {STAGING_TABLE}")
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+    report.inserted = report.read - len(report.invalid) - len(report.conflicts)
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="CSV or NDJSON file")
+    parser.add_argument("--format", choices=["csv", "ndjson"])
+    parser.add_argument(
+        "--workers", type=int, help="hashing processes (default: all cores)"
+    )
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument(
+        "--verified", action="store_true", help="mark imported emails as verified"
+    )
+    parser.add_argument("--conflicts-out", help="write skipped rows to this CSV")
+    args = parser.parse_args()
+
+    connection = get_engine().raw_connection()
+    try:
+        report = import_users(
+            read_rows(args.path, args.format),
+            connection,
+            workers=args.workers,
+            batch_size=args.batch_size,
+            verified=args.verified,
+        )
+        connection.commit()
+    except BaseException:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+    if args.conflicts_out:
+        with open(args.conflicts_out, "w", newline="", encoding="utf-8") as out:
+            writer = csv.writer(out)
+            writer.writerow(("line", "email", "reason"))
+            writer.writerows(report.conflicts)
+    for line, error in report.invalid:
+        print(f"line {line}: {error}", file=sys.stderr)
+    print(
+        f"read {report.read}, inserted {report.inserted}, "
+        f"conflicts {len(report.conflicts)}, invalid {len(report.invalid)} "
+        f"in {report.seconds:.1f}s ({report.rows_per_second:.0f} rows/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 import os
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from app.core.enums import OTPStoreBackend, RateLimitBackend
+
 
 class Settings(BaseSettings):
     database_hostname: str
@@ -10,11 +12,45 @@ class Settings(BaseSettings):
     database_username: str
     secret_key: str
     algorithm: str
+    database_async: bool = False
+    database_pool_size: int = 5
+    database_max_overflow: int = 10
+    database_pool_timeout: float = 30.0
+    database_pool_recycle: int = 1800
+    database_pool_pre_ping: bool = True
     rate_limit: int = 100
     rate_window: int = 60
+    rate_limit_max_clients: int = 100_000
+    rate_limit_backend: RateLimitBackend = RateLimitBackend.MEMORY
+    rate_limit_redis_retry: float = 5.0
     cache_ttl: int = 10
+    cache_max_entries: int = 1024
+    principal_cache_ttl: float = 5.0
+    principal_cache_max_entries: int = 10_000
+    principal_invalidation_pubsub: bool = False
+    principal_invalidation_channel: str = "principal-invalidation"
+    token_cache_ttl: float = 900.0
+    token_cache_max_entries: int = 10_000
+    password_hash_workers: int = 2
+    password_hash_max_pending: int = 32
+    argon2_time_cost: int = 3
+    argon2_memory_cost: int = 65536
+    argon2_parallelism: int = 4
+    sql_debug: bool = False
+    sql_debug_max_statements: int = 10
+    sql_debug_max_repeats: int = 3
+    otp_store_backend: OTPStoreBackend = OTPStoreBackend.DATABASE
+    otp_store_max_entries: int = 100_000
+    otp_sweep_interval: float = 300.0
+    otp_sweep_batch_size: int = 1000
+    otp_sweep_batch_timeout: float = 5.0
+    otp_sweep_max_batches: int = 100
+    access_log_sample_rate: float = 1.0
+    access_log_slow_seconds: float = 1.0
+    access_log_queue_size: int = 10_000
     redis_host: str = "localhost"
     redis_port: int = 6379
+    redis_socket_timeout: float = 0.25
 
     model_config = SettingsConfigDict(
         env_file=os.getenv("ENV_FILE", ".env"), extra="ignore"
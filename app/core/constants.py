@@ -1 +1,6 @@
 RESET_PASSWORD_WINDOW_MINUTES = 10
+OTP_EXPIRY_SECONDS = 300
+USERS_PAGE_DEFAULT_LIMIT = 50
+USERS_PAGE_MAX_LIMIT = 200
+USERS_EXPORT_BATCH_SIZE = 1000
+USERS_BATCH_MAX_IDS = 200
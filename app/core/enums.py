@@ -4,3 +4,19 @@ from enum import Enum
 class OTPPurpose(str, Enum):
     FORGOT_PASSWORD = "forgot_password"
     EMAIL_VERIFICATION = "email_verification"
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class OTPStoreBackend(str, Enum):
+    DATABASE = "database"
+    MEMORY = "memory"
+    REDIS = "redis"
+
+
+class RateLimitBackend(str, Enum):
+    MEMORY = "memory"
+    REDIS = "redis"
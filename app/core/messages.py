@@ -30,3 +30,7 @@ class Message(str, Enum):
     INVALID_OTP_PURPOSE = "Invalid OTP purpose."
 
     DETAILS_UPDATED = "Updated Details Successfully"
+
+    INVALID_CURSOR = "Invalid pagination cursor."
+
+    PASSWORD_HASHING_BUSY = "Server is busy. Please retry shortly."
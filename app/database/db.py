@@ -1,16 +1,69 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session, sessionmaker
+from functools import lru_cache
+
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
 
 from app.config.config import setting
+from app.database.pool import (
+    InstrumentedAsyncAdaptedQueuePool,
+    InstrumentedQueuePool,
+    pool_options,
+)
+
+
+_CREDENTIALS = (
+    f"{setting.database_username}:{setting.database_password}"
+    f"@{setting.database_hostname}:{setting.database_port}/{setting.database_name}"
+)
+DATABASE_URL = f"postgresql://{_CREDENTIALS}"
+ASYNC_DATABASE_URL = f"postgresql+asyncpg://{_CREDENTIALS}"
+
+
+# Engines and session factories are created on first use: building an
+# engine imports its DBAPI driver, and only one of the two is normally used.
+@lru_cache
+def get_engine() -> Engine:
+    return create_engine(
+        DATABASE_URL,
+        echo=False,
+        poolclass=InstrumentedQueuePool,
+        pool_logging_name="sync",
+        **pool_options(),
+    )
+
+
+@lru_cache
+def get_async_engine() -> AsyncEngine:
+    return create_async_engine(
+        ASYNC_DATABASE_URL,
+        echo=False,
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        pool_logging_name="async",
+        **pool_options(),
+    )
 
 
-DATABASE_URL = f"postgresql://{setting.database_username}:{setting.database_password}@{setting.database_hostname}:{setting.database_port}/{setting.database_name}"
-engine = create_engine(DATABASE_URL, echo=False)
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+@lru_cache
+def get_sessionmaker() -> sessionmaker:
+    return sessionmaker(bind=get_engine(), autoflush=False, autocommit=False)
+
+
+@lru_cache
+def get_async_sessionmaker() -> async_sessionmaker:
+    return async_sessionmaker(
+        bind=get_async_engine(), autoflush=False, expire_on_commit=False
+    )
+
 
 def get_db():
-    db = SessionLocal()
+    db = get_sessionmaker()()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
@@ -1,5 +1,5 @@
 from datetime import datetime, timezone
-from sqlalchemy import Column, String, DateTime, Integer, Boolean
+from sqlalchemy import Column, String, DateTime, Integer, Boolean, Index, func
 from sqlalchemy.orm import DeclarativeBase
 
 
@@ -10,25 +10,47 @@ class Base(DeclarativeBase):
 class UserModel(Base):
     __tablename__ = "users"
 
-    id = Column(Integer, index=True, primary_key=True, nullable=False)
+    id = Column(Integer, primary_key=True, nullable=False)
     first_name = Column(String, nullable=False)
     last_name = Column(String, nullable=False)
-    email = Column(String, nullable=False, unique=True)
+    email = Column(String, nullable=False)
     hashed_password = Column(String, nullable=False)
     is_email_verified = Column(Boolean, default=False)
     token_version = Column(Integer, default=0, nullable=False)
     is_active = Column(Boolean, default=True)
     is_deleted = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), default=datetime.now(timezone.utc))
+    # Set on insert and bumped by every UPDATE, including Core update()
+    # statements and those inside CTEs; the ETag and Last-Modified validators
+    # are derived from it. clock_timestamp() rather than now(), so that two
+    # writes in one transaction still get different values.
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=func.clock_timestamp(),
+        onupdate=func.clock_timestamp(),
+        server_default=func.now(),
+        index=True,
+    )
+
+    __table_args__ = (
+        # Emails are unique regardless of case and always looked up through
+        # lower(email); see user_email_is().
+        Index("uq_users_email_lower", func.lower(email), unique=True),
+    )
+
+
+def user_email_is(email: str):
+    return func.lower(UserModel.email) == func.lower(email)
 
 
 class OTPModel(Base):
     __tablename__ = "otp"
 
-    id = Column(Integer, primary_key=True, index=True, nullable=False)
+    id = Column(Integer, primary_key=True, nullable=False)
     email = Column(String, nullable=False, unique=True)
     otp = Column(String, nullable=True)
-    otp_expiry = Column(DateTime(timezone=True), nullable=True)
+    otp_expiry = Column(DateTime(timezone=True), nullable=True, index=True)
     purpose = Column(String, nullable=True)
     is_verified = Column(Boolean, default=False)
     verified_at = Column(DateTime(timezone=True), nullable=True)
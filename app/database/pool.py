@@ -0,0 +1,80 @@
+import time
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.config.config import setting
+
+
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out of the pool",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "Overflow connections currently open beyond pool_size",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting to check a connection out of the pool",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts",
+    "Checkouts that gave up after pool_timeout",
+    ["pool"],
+)
+
+
+class _InstrumentedPoolMixin:
+    # The label comes from pool_logging_name because QueuePool.recreate() only
+    # forwards its own constructor arguments.
+    def _pool_label(self) -> str:
+        return self._orig_logging_name or "default"
+
+    def _record_usage(self) -> None:
+        label = self._pool_label()
+        DB_POOL_CHECKED_OUT.labels(pool=label).set(self.checkedout())
+        DB_POOL_OVERFLOW.labels(pool=label).set(max(self.overflow(), 0))
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            DB_POOL_TIMEOUTS.labels(pool=self._pool_label()).inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_WAIT.labels(pool=self._pool_label()).observe(
+                time.perf_counter() - start
+            )
+            self._record_usage()
+
+    def _do_return_conn(self, record) -> None:
+        try:
+            super()._do_return_conn(record)
+        finally:
+            self._record_usage()
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_options() -> dict:
+    return {
+        "pool_size": setting.database_pool_size,
+        "max_overflow": setting.database_max_overflow,
+        "pool_timeout": setting.database_pool_timeout,
+        "pool_recycle": setting.database_pool_recycle,
+        "pool_pre_ping": setting.database_pool_pre_ping,
+    }
@@ -0,0 +1,106 @@
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from prometheus_client import Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config.config import setting
+
+logger = logging.getLogger("api")
+
+DB_REQUEST_STATEMENTS = Histogram(
+    "db_request_statements",
+    "SQL statements executed while handling a request",
+    ["method", "handler"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+DB_REQUEST_SECONDS = Histogram(
+    "db_request_seconds",
+    "Time spent executing SQL statements while handling a request",
+    ["method", "handler"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+
+@dataclass
+class QueryStats:
+    statements: int = 0
+    seconds: float = 0.0
+    # SQLAlchemy hands us the statement with bound parameters still as
+    # placeholders, so the text doubles as the statement's shape.
+    shapes: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.statements += 1
+        self.seconds += seconds
+        self.shapes[statement] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        return [
+            (statement, count)
+            for statement, count in self.shapes.most_common()
+            if count >= threshold
+        ]
+
+
+# The stats object is shared by reference, so statements run by sync routes
+# in the threadpool (which gets a copy of the context) still land here.
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+# Start of the statement in flight; before/after_cursor_execute for one
+# statement run in the same thread and context.
+_started: ContextVar[float | None] = ContextVar("query_started", default=None)
+
+
+@contextmanager
+def track_queries():
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        _started.set(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    start = _started.get()
+    if stats is not None and start is not None:
+        _started.set(None)
+        stats.record(statement, time.perf_counter() - start)
+
+
+def observe_query_stats(stats: QueryStats, method: str, handler: str) -> None:
+    DB_REQUEST_STATEMENTS.labels(method=method, handler=handler).observe(
+        stats.statements
+    )
+    DB_REQUEST_SECONDS.labels(method=method, handler=handler).observe(stats.seconds)
+    if not setting.sql_debug:
+        return
+    if stats.statements > setting.sql_debug_max_statements:
+        logger.warning(
+            "%s %s ran %d SQL statements (limit %d)",
+            method,
+            handler,
+            stats.statements,
+            setting.sql_debug_max_statements,
+        )
+    for statement, count in stats.repeated(setting.sql_debug_max_repeats):
+        logger.warning(
+            "%s %s ran the same SQL statement %d times, possible N+1: %s",
+            method,
+            handler,
+            count,
+            " ".join(statement.split())[:200],
+        )
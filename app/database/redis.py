@@ -0,0 +1,35 @@
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from app.config.config import setting
+
+if TYPE_CHECKING:
+    import redis
+    import redis.asyncio as aioredis
+
+# redis is only imported once a Redis-backed feature asks for a client, so
+# deployments that do not use Redis do not pay for the import at startup.
+
+
+@lru_cache
+def get_redis() -> "redis.Redis":
+    import redis
+
+    return redis.Redis(
+        host=setting.redis_host,
+        port=setting.redis_port,
+        socket_timeout=setting.redis_socket_timeout,
+        socket_connect_timeout=setting.redis_socket_timeout,
+    )
+
+
+@lru_cache
+def get_async_redis() -> "aioredis.Redis":
+    import redis.asyncio as aioredis
+
+    return aioredis.Redis(
+        host=setting.redis_host,
+        port=setting.redis_port,
+        socket_timeout=setting.redis_socket_timeout,
+        socket_connect_timeout=setting.redis_socket_timeout,
+    )
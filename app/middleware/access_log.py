@@ -0,0 +1,123 @@
+import json
+import logging
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from prometheus_client import Counter
+
+from app.config.config import setting
+
+ACCESS_LOG_DROPPED = Counter(
+    "access_log_dropped", "Access log records dropped because the queue was full"
+)
+
+
+class JSONFormatter(logging.Formatter):
+    """Renders the ``access`` dict attached to a record as one JSON line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            **getattr(record, "access", {}),
+        }
+        return json.dumps(entry, separators=(",", ":"))
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Queues records unformatted; drops and counts them when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue, access_log: "AccessLog"):
+        super().__init__(log_queue)
+        self.access_log = access_log
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.access_log.dropped += 1
+            ACCESS_LOG_DROPPED.inc()
+
+
+class DrainingQueueListener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # The queue may be full at shutdown; wait for room rather than fail.
+        self.queue.put(self._sentinel)
+
+
+class AccessLog:
+    """Sampled JSON access log; errors and slow requests are always kept."""
+
+    def __init__(
+        self,
+        sample_rate: float,
+        slow_seconds: float,
+        queue_size: int,
+        handler: logging.Handler | None = None,
+        name: str = "api.access",
+    ):
+        self.sample_rate = sample_rate
+        self.slow_seconds = slow_seconds
+        self.dropped = 0
+        self.logger = logging.getLogger(name)
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._queue_handler = DroppingQueueHandler(self._queue, self)
+        if handler is None:
+            handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(JSONFormatter())
+        self._listener = DrainingQueueListener(self._queue, handler)
+        self._started = False
+
+    def start(self) -> None:
+        if self._started:
+            return
+        self.logger.addHandler(self._queue_handler)
+        self._listener.start()
+        self._started = True
+
+    def stop(self) -> None:
+        if not self._started:
+            return
+        self.logger.removeHandler(self._queue_handler)
+        # Writes out whatever is still queued before returning.
+        self._listener.stop()
+        self._started = False
+
+    def sampled(self, status_code: int, seconds: float) -> bool:
+        if status_code >= 400 or seconds >= self.slow_seconds:
+            return True
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def log(
+        self, client: str, method: str, path: str, status_code: int, seconds: float
+    ) -> None:
+        if not self._started or not self.sampled(status_code, seconds):
+            return
+        self.logger.info(
+            "access",
+            extra={
+                "access": {
+                    "client": client,
+                    "method": method,
+                    "path": path,
+                    "status": status_code,
+                    "duration_ms": round(seconds * 1000, 3),
+                    "sample_rate": self.sample_rate,
+                }
+            },
+        )
+
+
+access_log = AccessLog(
+    sample_rate=setting.access_log_sample_rate,
+    slow_seconds=setting.access_log_slow_seconds,
+    queue_size=setting.access_log_queue_size,
+)
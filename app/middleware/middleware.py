@@ -1,51 +1,151 @@
 import time
 import logging
-from fastapi import Request, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from app.config.config import setting
+from app.core.enums import RateLimitBackend
+from app.database.query_stats import observe_query_stats, track_queries
+from app.database.redis import get_async_redis
+from app.middleware.access_log import access_log
+from app.middleware.rate_limit import RedisRateLimiter, SlidingWindowRateLimiter
+from app.utils.cache import TTLCache
+from app.utils.principal_cache import publish_invalidation, register_invalidation
 
 logger = logging.getLogger("api")
 
 RATE_LIMIT = setting.rate_limit
 RATE_WINDOW = setting.rate_window
 
-rate_limit_store = {}
-
-CACHE_TTL = 10
-response_cache = {}
-
-
-async def middleware_handler(request: Request, call_next):
-    start_time = time.perf_counter()
-    try:
-        client_ip = request.client.host if request.client else "unknown"
-        path = request.url.path
-        method = request.method
-        now = time.time()
-        timestamps = rate_limit_store.get(client_ip, [])
-        timestamps = [t for t in timestamps if now - t < RATE_WINDOW]
-        if len(timestamps) >= RATE_LIMIT:
-            # raise HTTPException(status_code=429, detail="Too many requests") #fastapi.exceptions.HTTPException: 429: Too many requests
-            # return HTTPException(status_code=429, detail="Too many requests")  #TypeError: 'HTTPException' object is not callable
-            return JSONResponse(status_code=429, content={"detail": "Too many requests"})
-        timestamps.append(now)
-        rate_limit_store[client_ip] = timestamps
-        response = await call_next(request)
-        process_time = time.perf_counter() - start_time
-        response.headers["X-Process-Time"] = f"{process_time:.4f}s"
-        logger.info(
-            f"{client_ip} | {method} {path} | "
-            f"{response.status_code} | {process_time:.4f}s"
-        )
-        return response
-    except HTTPException as exc:
-        logger.warning(
-            f"HTTPException | {request.method} {request.url.path} | {exc.detail}"
-        )
-        raise exc
-    except Exception:
-        logger.exception(f"Unhandled error | {request.method} {request.url.path}")
-        return JSONResponse(
-            status_code=500,
-            content={"message": "Something went wrong"},
+rate_limit_store = SlidingWindowRateLimiter(
+    limit=RATE_LIMIT, window=RATE_WINDOW, max_clients=setting.rate_limit_max_clients
+)
+
+
+def build_rate_limiter():
+    if setting.rate_limit_backend == RateLimitBackend.REDIS:
+        return RedisRateLimiter(
+            client=get_async_redis(),
+            limit=RATE_LIMIT,
+            window=RATE_WINDOW,
+            fallback=rate_limit_store,
+            retry_after=setting.rate_limit_redis_retry,
         )
+    return rate_limit_store
+
+
+CACHE_TTL = setting.cache_ttl
+# Rendered JSON bodies of the authenticated user GET endpoints. Lookups happen
+# inside the routes after get_current_user has accepted the caller, and the
+# cached bodies do not depend on who the caller is. Writes reach other workers
+# over the principal invalidation channel when PRINCIPAL_INVALIDATION_PUBSUB
+# is on; otherwise they can serve a stale body for up to CACHE_TTL seconds.
+response_cache = TTLCache(
+    name="response", maxsize=setting.cache_max_entries, ttl=CACHE_TTL
+)
+USER_CACHE_KEY = "user"
+USERS_CACHE_KEY = "users"
+
+
+def cached_response(key: tuple) -> Response | None:
+    entry = response_cache.get(key)
+    if entry is None:
+        return None
+    body, headers = entry
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def cache_response(
+    key: tuple, model: BaseModel, headers: dict[str, str] | None = None
+) -> Response:
+    # Validator headers are cached with the body so that a cache hit can
+    # answer a conditional request without touching the database.
+    body = model.model_dump_json().encode()
+    response_cache.set(key, (body, headers))
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _drop_user_responses(user_ids: list[int] | tuple[int, ...]) -> None:
+    for user_id in user_ids:
+        response_cache.pop((USER_CACHE_KEY, user_id))
+    response_cache.pop_where(lambda key: key[0] == USERS_CACHE_KEY)
+
+
+def invalidate_user_cache(*user_ids: int) -> None:
+    _drop_user_responses(user_ids)
+    publish_invalidation(user_ids, name=response_cache.name)
+
+
+register_invalidation(response_cache.name, _drop_user_responses, response_cache.clear)
+
+
+class RequestMiddleware:
+    """Rate limiting, timing, SQL stats and access logging as raw ASGI."""
+
+    def __init__(self, app: ASGIApp, rate_limiter=None):
+        self.app = app
+        self.rate_limiter = rate_limiter or build_rate_limiter()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
+        method = scope["method"]
+        path = scope["path"]
+        if not await self.rate_limiter.hit(client_ip):
+            response = JSONResponse(
+                status_code=429, content={"detail": "Too many requests"}
+            )
+            await response(scope, receive, send)
+            return
+
+        status_code = 500
+        response_started = False
+
+        async def send_with_headers(message: Message) -> None:
+            nonlocal status_code, response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                status_code = message["status"]
+                process_time = time.perf_counter() - start_time
+                headers = MutableHeaders(scope=message)
+                headers["X-Process-Time"] = f"{process_time:.4f}s"
+                # A streamed body (no Content-Length) may still be running
+                # queries, so its counts would be partial; the metrics
+                # recorded after the body is sent have the final numbers.
+                if "content-length" in headers or status_code in (204, 304):
+                    headers["X-DB-Statements"] = str(query_stats.statements)
+                    headers["X-DB-Time"] = f"{query_stats.seconds:.4f}s"
+            await send(message)
+
+        try:
+            with track_queries() as query_stats:
+                await self.app(scope, receive, send_with_headers)
+        except HTTPException as exc:
+            logger.warning("HTTPException | %s %s | %s", method, path, exc.detail)
+            raise exc
+        except Exception:
+            logger.exception("Unhandled error | %s %s", method, path)
+            access_log.log(
+                client_ip, method, path, 500, time.perf_counter() - start_time
+            )
+            if response_started:
+                raise
+            response = JSONResponse(
+                status_code=500,
+                content={"message": "Something went wrong"},
+            )
+            await response(scope, receive, send)
+            return
+
+        process_time = time.perf_counter() - start_time
+        route = scope.get("route")
+        if route is not None:
+            observe_query_stats(query_stats, method, route.path)
+        access_log.log(client_ip, method, path, status_code, process_time)
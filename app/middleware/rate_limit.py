@@ -0,0 +1,139 @@
+import logging
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger("api")
+
+# Same sliding-window-counter estimate as SlidingWindowRateLimiter, evaluated
+# atomically inside Redis so every worker and host shares one set of counters.
+# KEYS[1] and KEYS[2] are the client's current and previous window counters,
+# both named by the caller so the script only touches declared keys. ARGV[3]
+# is the share of the previous window still inside the sliding window. Both
+# come from the caller's wall clock, so hosts must keep their clocks in sync.
+SLIDING_WINDOW_SCRIPT = """
+local window = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local overlap = tonumber(ARGV[3])
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+if previous * overlap + current >= limit then
+    return 0
+end
+redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], window * 2)
+return 1
+"""
+
+
+class SlidingWindowRateLimiter:
+    """Sliding-window-counter limiter with a bounded, LRU-ordered client table.
+
+    Each client keeps the request count of the current and the previous fixed
+    window; the previous count is weighted by how much of it still overlaps
+    the sliding window. Every call is O(1) and the table never holds more than
+    ``max_clients`` entries.
+    """
+
+    def __init__(self, limit: int, window: float, max_clients: int):
+        self.limit = limit
+        self.window = window
+        self.max_clients = max_clients
+        # client -> [window_start, current_count, previous_count]
+        self._clients: OrderedDict[str, list] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def clear(self) -> None:
+        self._clients.clear()
+
+    async def hit(self, key: str) -> bool:
+        return self.allow(key)
+
+    def allow(self, key: str, now: float | None = None) -> bool:
+        if now is None:
+            now = time.monotonic()
+        window_start = now - now % self.window
+        entry = self._clients.get(key)
+        if entry is None:
+            self._evict(window_start)
+            entry = [window_start, 0, 0]
+            self._clients[key] = entry
+        else:
+            self._clients.move_to_end(key)
+            if entry[0] != window_start:
+                adjacent = window_start - entry[0] <= self.window
+                entry[2] = entry[1] if adjacent else 0
+                entry[1] = 0
+                entry[0] = window_start
+        overlap = 1 - (now - window_start) / self.window
+        if entry[2] * overlap + entry[1] >= self.limit:
+            return False
+        entry[1] += 1
+        return True
+
+    def _evict(self, window_start: float) -> None:
+        if len(self._clients) >= self.max_clients:
+            self._clients.popitem(last=False)
+            return
+        # Opportunistically drop the least recently seen client once it has
+        # been idle for two windows, since its counts no longer matter.
+        if self._clients:
+            oldest_key, oldest = next(iter(self._clients.items()))
+            if window_start - oldest[0] > self.window:
+                del self._clients[oldest_key]
+
+
+class RedisRateLimiter:
+    """Shares rate limit counters across workers and hosts through Redis.
+
+    Each request costs a single EVALSHA round trip. While Redis is unreachable
+    requests are counted by ``fallback`` instead, and Redis is retried after
+    ``retry_after`` seconds.
+    """
+
+    def __init__(
+        self,
+        client,
+        limit: int,
+        window: int,
+        fallback: SlidingWindowRateLimiter,
+        retry_after: float,
+        prefix: str = "rate_limit",
+    ):
+        self.limit = limit
+        self.window = window
+        self.fallback = fallback
+        self.retry_after = retry_after
+        self.prefix = prefix
+        self._script = client.register_script(SLIDING_WINDOW_SCRIPT)
+        self._retry_at = 0.0
+
+    async def hit(self, key: str) -> bool:
+        from redis.exceptions import RedisError
+
+        now = time.monotonic()
+        if now < self._retry_at:
+            return self.fallback.allow(key, now)
+        wall = time.time()
+        window_start = int(wall // self.window * self.window)
+        overlap = 1 - (wall - window_start) / self.window
+        # The {key} hash tag keeps both counters in one cluster slot.
+        client = f"{self.prefix}:{{{key}}}"
+        try:
+            allowed = await self._script(
+                keys=[
+                    f"{client}:{window_start}",
+                    f"{client}:{window_start - self.window}",
+                ],
+                args=[self.window, self.limit, overlap],
+            )
+        except RedisError:
+            logger.warning(
+                "Redis rate limiter unavailable, using local limiter for %ss",
+                self.retry_after,
+                exc_info=True,
+            )
+            self._retry_at = now + self.retry_after
+            return self.fallback.allow(key, now)
+        return bool(allowed)
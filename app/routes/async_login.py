@@ -0,0 +1,47 @@
+from fastapi import Depends, HTTPException, status
+from fastapi.routing import APIRouter
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Annotated
+
+from app.core.messages import Message
+from app.core.auth_constants import TokenClaim
+from app.database.db import get_async_db
+from app.schemas.token import Token
+from app.routes.login import login_query, rehash_statement
+from app.utils.hashing import record_rehash, verify_and_update_password_async
+from app.utils.login_util import create_access_token
+
+router = APIRouter(prefix="/login", tags=["Login"])
+
+
+@router.post("/")
+async def login(
+    login_user: Annotated[OAuth2PasswordRequestForm, Depends()],
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+):
+    user = (await db.execute(login_query(login_user.username))).first()
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=Message.BAD_LOGIN_REQUEST.value,
+        )
+    if not user.is_email_verified:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=Message.EMAIL_NOT_VERIFIED.value,
+        )
+    valid, updated_hash = await verify_and_update_password_async(
+        login_user.password, user.hashed_password
+    )
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail=Message.WRONG_CREDS.value
+        )
+    user_dict = {TokenClaim.USER_ID.value: user.id}
+    token = create_access_token(token_version=user.token_version, data=user_dict)
+    if updated_hash:
+        await db.execute(rehash_statement(user, updated_hash))
+        await db.commit()
+        record_rehash()
+    return Token(**token)
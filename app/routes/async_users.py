@@ -0,0 +1,205 @@
+from fastapi import Depends, Query, Request, status
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.routing import APIRouter
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Annotated
+
+from app.core.constants import USERS_PAGE_DEFAULT_LIMIT, USERS_PAGE_MAX_LIMIT
+from app.core.enums import ExportFormat
+from app.core.messages import Message
+from app.core.response_keys import ResponseKey
+from app.database.db import get_async_db
+from app.middleware.middleware import (
+    USER_CACHE_KEY,
+    USERS_CACHE_KEY,
+    cache_response,
+    cached_response,
+)
+from app.services.async_user_service import AsyncUserService
+from app.utils.conditional import (
+    has_preconditions,
+    not_modified,
+    user_validators,
+    users_validators,
+)
+from app.utils.export import MEDIA_TYPES
+from app.utils.principal_cache import Principal
+from app.utils.login_util import get_current_user_async
+from app.schemas.response import (
+    BatchResultSchema,
+    BatchUsersSchema,
+    ResponseUserSchema,
+    UsersSchema,
+)
+from app.schemas.request import (
+    OTPRequest,
+    RegisterUserSchema,
+    UpdatePasswordSchema,
+    UserIdsSchema,
+    UserUpdateSchema,
+    VerifyOTP,
+    VerifyPasssword,
+)
+
+
+router = APIRouter(prefix="/users", tags=["Users"])
+
+
+@router.post("/create")
+async def create_user(
+    user: RegisterUserSchema, db: Annotated[AsyncSession, Depends(get_async_db)]
+):
+    user: ResponseUserSchema = await AsyncUserService().create_user(user=user, db=db)
+    return JSONResponse(content=user.model_dump(), status_code=status.HTTP_201_CREATED)
+
+
+@router.post("/otp/request")
+async def send_otp(user: OTPRequest, db: AsyncSession = Depends(get_async_db)):
+    return await AsyncUserService().send_otp(request_user=user, db=db)
+
+
+@router.post("/otp/verify")
+async def verify_otp(user: VerifyOTP, db: AsyncSession = Depends(get_async_db)):
+    return await AsyncUserService().verify_otp(request_user=user, db=db)
+
+
+@router.get("/all")
+async def get_all_users(
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    current_user: Principal = Depends(get_current_user_async),
+    limit: Annotated[int, Query(ge=1, le=USERS_PAGE_MAX_LIMIT)] = (
+        USERS_PAGE_DEFAULT_LIMIT
+    ),
+    after: str | None = None,
+):
+    cache_key = (USERS_CACHE_KEY, limit, after)
+    response = cached_response(cache_key)
+    if response:
+        return not_modified(request, response.headers) or response
+    service = AsyncUserService()
+    headers = users_validators(limit, after, *await service.get_users_version(db=db))
+    if response := not_modified(request, headers):
+        return response
+    users: UsersSchema = await service.get_all_user(
+        db=db, limit=limit, after=after
+    )
+    return cache_response(cache_key, users, headers)
+
+
+@router.get("/export")
+async def export_users(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    current_user: Principal = Depends(get_current_user_async),
+    format: ExportFormat = ExportFormat.NDJSON,
+):
+    return StreamingResponse(
+        AsyncUserService().export_users(fmt=format, db=db),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=users.{format.value}"},
+    )
+
+
+@router.post("/batch")
+async def get_users_batch(
+    request: UserIdsSchema,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    current_user: Principal = Depends(get_current_user_async),
+):
+    users: BatchUsersSchema = await AsyncUserService().get_users_batch(
+        request=request, db=db
+    )
+    return users
+
+
+@router.post("/batch/deactivate")
+async def deactivate_users(
+    request: UserIdsSchema,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    current_user: Principal = Depends(get_current_user_async),
+):
+    result: BatchResultSchema = await AsyncUserService().deactivate_users(
+        request=request, db=db
+    )
+    return result
+
+
+@router.post("/batch/delete")
+async def delete_users(
+    request: UserIdsSchema,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    current_user: Principal = Depends(get_current_user_async),
+):
+    result: BatchResultSchema = await AsyncUserService().delete_users(
+        request=request, current_user=current_user, db=db
+    )
+    return result
+
+
+@router.get("/{id}")
+async def get_user(
+    id: int,
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    current_user: Principal = Depends(get_current_user_async),
+):
+    cache_key = (USER_CACHE_KEY, id)
+    response = cached_response(cache_key)
+    if response:
+        return not_modified(request, response.headers) or response
+    service = AsyncUserService()
+    if has_preconditions(request):
+        # Only the version is read; a match skips the fetch and serialization.
+        updated_at = await service.get_user_version(id=id, db=db)
+        headers = user_validators(id, updated_at)
+        if response := not_modified(request, headers):
+            return response
+    user, updated_at = await service.get_user_with_version(id=id, db=db)
+    return cache_response(cache_key, user, user_validators(id, updated_at))
+
+
+@router.delete("/delete/{id}")
+async def delete_user(
+    id: int,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    current_user: Principal = Depends(get_current_user_async),
+):
+    await AsyncUserService().delete_user(id=id, current_user=current_user, db=db)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.put("/update-detail")
+async def update_user(
+    user: UserUpdateSchema,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    current_user: Principal = Depends(get_current_user_async),
+):
+    await AsyncUserService().update_user(
+        details=user, current_user=current_user, db=db
+    )
+    return JSONResponse(
+        content={ResponseKey.DETAIL.value: Message.DETAILS_UPDATED.value},
+        status_code=status.HTTP_202_ACCEPTED,
+    )
+
+
+@router.patch("/update-password")
+async def update_password(
+    password: UpdatePasswordSchema,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    current_user: Principal = Depends(get_current_user_async),
+):
+    await AsyncUserService().update_password(
+        password=password, db=db, current_user=current_user
+    )
+    return JSONResponse(
+        content={ResponseKey.DETAIL.value: Message.PASSWORD_UPDATED.value},
+        status_code=status.HTTP_202_ACCEPTED,
+    )
+
+
+@router.patch("/forgot-password")
+async def forget_password_verify(
+    user: VerifyPasssword, db: AsyncSession = Depends(get_async_db)
+):
+    return await AsyncUserService().forget_password(request_user=user, db=db)
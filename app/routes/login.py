@@ -1,25 +1,51 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.routing import APIRouter
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 from typing import Annotated
 
 from app.core.messages import Message
 from app.core.auth_constants import TokenClaim
 from app.database.db import get_db
-from app.database.models import UserModel
+from app.database.models import UserModel, user_email_is
 from app.schemas.token import Token
-from app.utils.login_util import create_access_token, verify_password
+from app.utils.hashing import record_rehash, verify_and_update_password
+from app.utils.login_util import create_access_token
 
 router = APIRouter(prefix="/login", tags=["Login"])
 
 
+def login_query(username: str):
+    # Served by uq_users_email_lower. Inactive accounts are turned away by
+    # the auth dependency, not here.
+    return select(
+        UserModel.id,
+        UserModel.hashed_password,
+        UserModel.is_email_verified,
+        UserModel.token_version,
+    ).where(user_email_is(username))
+
+
+def rehash_statement(user, updated_hash: str):
+    # Only replace the hash we verified against, never a concurrent change.
+    return (
+        update(UserModel)
+        .where(
+            UserModel.id == user.id,
+            UserModel.hashed_password == user.hashed_password,
+        )
+        .values(hashed_password=updated_hash)
+        .execution_options(synchronize_session=False)
+    )
+
+
 @router.post("/")
 def login(
     login_user: Annotated[OAuth2PasswordRequestForm, Depends()],
     db: Annotated[Session, Depends(get_db)],
 ):
-    user = db.query(UserModel).filter(UserModel.email == login_user.username).first()
+    user = db.execute(login_query(login_user.username)).first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -30,11 +56,17 @@ def login(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=Message.EMAIL_NOT_VERIFIED.value,
         )
-    if not verify_password(login_user.password, user.hashed_password):
+    valid, updated_hash = verify_and_update_password(
+        login_user.password, user.hashed_password
+    )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail=Message.WRONG_CREDS.value
         )
     user_dict = {TokenClaim.USER_ID.value: user.id}
-    return Token(
-        **create_access_token(token_version=user.token_version, data=user_dict)
-    )
+    token = create_access_token(token_version=user.token_version, data=user_dict)
+    if updated_hash:
+        db.execute(rehash_statement(user, updated_hash))
+        db.commit()
+        record_rehash()
+    return Token(**token)
@@ -1,20 +1,41 @@
-from fastapi import Depends, status
-from fastapi.responses import JSONResponse, Response
+from fastapi import Depends, Query, Request, status
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.routing import APIRouter
 from sqlalchemy.orm import Session
 from typing import Annotated
 
+from app.core.constants import USERS_PAGE_DEFAULT_LIMIT, USERS_PAGE_MAX_LIMIT
+from app.core.enums import ExportFormat
 from app.core.messages import Message
 from app.core.response_keys import ResponseKey
 from app.database.db import get_db
-from app.database.models import UserModel
+from app.middleware.middleware import (
+    USER_CACHE_KEY,
+    USERS_CACHE_KEY,
+    cache_response,
+    cached_response,
+)
 from app.services.user_service import UserService
+from app.utils.conditional import (
+    has_preconditions,
+    not_modified,
+    user_validators,
+    users_validators,
+)
+from app.utils.export import MEDIA_TYPES
+from app.utils.principal_cache import Principal
 from app.utils.login_util import get_current_user
-from app.schemas.response import ResponseUserSchema, UsersSchema
+from app.schemas.response import (
+    BatchResultSchema,
+    BatchUsersSchema,
+    ResponseUserSchema,
+    UsersSchema,
+)
 from app.schemas.request import (
     OTPRequest,
     RegisterUserSchema,
     UpdatePasswordSchema,
+    UserIdsSchema,
     UserUpdateSchema,
     VerifyOTP,
     VerifyPasssword,
@@ -42,28 +63,99 @@ def verify_otp(user: VerifyOTP, db: Session = Depends(get_db)):
 
 @router.get("/all")
 def get_all_users(
+    request: Request,
+    db: Annotated[Session, Depends(get_db)],
+    current_user: Principal = Depends(get_current_user),
+    limit: Annotated[int, Query(ge=1, le=USERS_PAGE_MAX_LIMIT)] = (
+        USERS_PAGE_DEFAULT_LIMIT
+    ),
+    after: str | None = None,
+):
+    cache_key = (USERS_CACHE_KEY, limit, after)
+    response = cached_response(cache_key)
+    if response:
+        return not_modified(request, response.headers) or response
+    service = UserService()
+    headers = users_validators(limit, after, *service.get_users_version(db=db))
+    if response := not_modified(request, headers):
+        return response
+    users: UsersSchema = service.get_all_user(
+        db=db, limit=limit, after=after
+    )
+    return cache_response(cache_key, users, headers)
+
+
+@router.get("/export")
+def export_users(
+    db: Annotated[Session, Depends(get_db)],
+    current_user: Principal = Depends(get_current_user),
+    format: ExportFormat = ExportFormat.NDJSON,
+):
+    return StreamingResponse(
+        UserService().export_users(fmt=format, db=db),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=users.{format.value}"},
+    )
+
+
+@router.post("/batch")
+def get_users_batch(
+    request: UserIdsSchema,
+    db: Annotated[Session, Depends(get_db)],
+    current_user: Principal = Depends(get_current_user),
+):
+    users: BatchUsersSchema = UserService().get_users_batch(request=request, db=db)
+    return users
+
+
+@router.post("/batch/deactivate")
+def deactivate_users(
+    request: UserIdsSchema,
     db: Annotated[Session, Depends(get_db)],
-    current_user: UserModel = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
-    users: UsersSchema = UserService().get_all_user(db=db)
-    return JSONResponse(content=users.model_dump(), status_code=status.HTTP_200_OK)
+    result: BatchResultSchema = UserService().deactivate_users(request=request, db=db)
+    return result
+
+
+@router.post("/batch/delete")
+def delete_users(
+    request: UserIdsSchema,
+    db: Annotated[Session, Depends(get_db)],
+    current_user: Principal = Depends(get_current_user),
+):
+    result: BatchResultSchema = UserService().delete_users(
+        request=request, current_user=current_user, db=db
+    )
+    return result
 
 
 @router.get("/{id}")
 def get_user(
     id: int,
+    request: Request,
     db: Annotated[Session, Depends(get_db)],
-    current_user: UserModel = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
-    user: ResponseUserSchema = UserService().get_user(id=id, db=db)
-    return JSONResponse(content=user.model_dump(), status_code=status.HTTP_200_OK)
+    cache_key = (USER_CACHE_KEY, id)
+    response = cached_response(cache_key)
+    if response:
+        return not_modified(request, response.headers) or response
+    service = UserService()
+    if has_preconditions(request):
+        # Only the version is read; a match skips the fetch and serialization.
+        headers = user_validators(id, service.get_user_version(id=id, db=db))
+        if response := not_modified(request, headers):
+            return response
+    user, updated_at = service.get_user_with_version(id=id, db=db)
+    return cache_response(cache_key, user, user_validators(id, updated_at))
 
 
 @router.delete("/delete/{id}")
 def delete_user(
     id: int,
     db: Annotated[Session, Depends(get_db)],
-    current_user: UserModel = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     UserService().delete_user(id=id, current_user=current_user, db=db)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -73,7 +165,7 @@ def delete_user(
 def update_user(
     user: UserUpdateSchema,
     db: Annotated[Session, Depends(get_db)],
-    current_user: UserModel = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     UserService().update_user(details=user, current_user=current_user, db=db)
     return JSONResponse(
@@ -86,7 +178,7 @@ def update_user(
 def update_password(
     password: UpdatePasswordSchema,
     db: Annotated[Session, Depends(get_db)],
-    current_user: UserModel = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     UserService().update_password(password=password, db=db, current_user=current_user)
     return JSONResponse(
@@ -1,12 +1,19 @@
-from pydantic import BaseModel, EmailStr
+from typing import Annotated
 
+from pydantic import AfterValidator, BaseModel, EmailStr, Field
+
+from app.core.constants import USERS_BATCH_MAX_IDS
 from app.core.enums import OTPPurpose
 
+# Emails are stored and looked up lowercased (see uq_users_email_lower), and
+# OTP records are keyed by them, so any casing a client sends matches.
+NormalizedEmail = Annotated[EmailStr, AfterValidator(str.lower)]
+
 
 class RegisterUserSchema(BaseModel):
     first_name: str
     last_name: str
-    email: EmailStr
+    email: NormalizedEmail
     password: str
 
 
@@ -21,15 +28,19 @@ class UpdatePasswordSchema(BaseModel):
 
 
 class OTPRequest(BaseModel):
-    email: EmailStr
+    email: NormalizedEmail
     purpose: OTPPurpose
 
 
 class VerifyPasssword(BaseModel):
-    email: EmailStr
+    email: NormalizedEmail
     new_password: str
 
 
 class VerifyOTP(BaseModel):
-    email: EmailStr
+    email: NormalizedEmail
     otp: str
+
+
+class UserIdsSchema(BaseModel):
+    ids: list[int] = Field(min_length=1, max_length=USERS_BATCH_MAX_IDS)
@@ -12,5 +12,15 @@ class ResponseUserSchema(BaseModel):
 
 class UsersSchema(BaseModel):
     users: list[ResponseUserSchema]
+    next_cursor: str | None = None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class BatchUsersSchema(BaseModel):
+    users: list[ResponseUserSchema]
+    missing: list[int]
+
+
+class BatchResultSchema(BaseModel):
+    ids: list[int]
@@ -0,0 +1,280 @@
+from datetime import datetime, timedelta, timezone
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.constants import (
+    OTP_EXPIRY_SECONDS,
+    RESET_PASSWORD_WINDOW_MINUTES,
+    USERS_PAGE_DEFAULT_LIMIT,
+)
+from app.schemas.response import BatchResultSchema, ResponseUserSchema
+from app.core.enums import ExportFormat
+from app.services.user_service import (
+    bump_token_version_statement,
+    create_user_statement,
+    deactivate_users_statement,
+    delete_users_statement,
+    update_password_statement,
+    update_user_statement,
+    user_not_found,
+    user_version_query,
+    user_with_version_query,
+    users_batch,
+    users_batch_query,
+    users_export_query,
+    users_page,
+    users_page_query,
+    users_version_query,
+)
+from app.utils.export import export_chunk, export_header
+from app.utils.hashing import hash_password_async, verify_password_async
+from app.utils.otp import generate_otp
+from app.utils.otp_store import OTPRecord, otp_store, user_exists
+from app.utils.principal_cache import Principal, invalidate_principal
+from app.database.models import UserModel, user_email_is
+from app.middleware.middleware import invalidate_user_cache
+from app.schemas.request import (
+    OTPRequest,
+    RegisterUserSchema,
+    UpdatePasswordSchema,
+    UserIdsSchema,
+    UserUpdateSchema,
+    VerifyOTP,
+    VerifyPasssword,
+    OTPPurpose,
+)
+from app.core.messages import Message
+from app.core.response_keys import ResponseKey
+
+
+class AsyncUserService:
+    async def create_user(self, user: RegisterUserSchema, db: AsyncSession):
+        user_model = user.model_dump()
+        user_model.pop(ResponseKey.PASSWORD.value)
+        user_model["hashed_password"] = await hash_password_async(user.password)
+        new_user = (await db.execute(create_user_statement(user_model))).first()
+        await db.commit()
+        if not new_user:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=Message.USER_ALREADY_EXISTS.value,
+            )
+        invalidate_user_cache(new_user.id)
+        return ResponseUserSchema.model_validate(new_user)
+
+    async def get_all_user(
+        self,
+        db: AsyncSession,
+        limit: int = USERS_PAGE_DEFAULT_LIMIT,
+        after: str | None = None,
+    ):
+        rows = (await db.execute(users_page_query(limit=limit, after=after))).all()
+        return users_page(rows, limit)
+
+    async def export_users(self, fmt: ExportFormat, db: AsyncSession):
+        yield export_header(fmt)
+        result = await db.stream(users_export_query())
+        async for rows in result.partitions():
+            yield export_chunk(rows, fmt)
+
+    async def get_users_version(self, db: AsyncSession) -> tuple[int, datetime | None]:
+        return tuple((await db.execute(users_version_query())).one())
+
+    async def get_user(self, id: int, db: AsyncSession):
+        return (await self.get_user_with_version(id=id, db=db))[0]
+
+    async def get_user_with_version(
+        self, id: int, db: AsyncSession
+    ) -> tuple[ResponseUserSchema, datetime]:
+        user = (await db.execute(user_with_version_query(id))).first()
+        if not user:
+            raise user_not_found()
+        return ResponseUserSchema.model_validate(user), user.updated_at
+
+    async def get_user_version(self, id: int, db: AsyncSession) -> datetime:
+        updated_at = await db.scalar(user_version_query(id))
+        if updated_at is None:
+            raise user_not_found()
+        return updated_at
+
+    async def update_user(
+        self, details: UserUpdateSchema, current_user: Principal, db: AsyncSession
+    ):
+        values = details.model_dump(exclude_unset=True)
+        if values:
+            await db.execute(update_user_statement(current_user.id, values))
+            await db.commit()
+        invalidate_user_cache(current_user.id)
+
+    async def delete_user(self, id: int, current_user: Principal, db: AsyncSession):
+        if not (await db.scalars(delete_users_statement([id]))).first():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=Message.USER_NOT_FOUND.value,
+            )
+        await db.execute(bump_token_version_statement(current_user.id))
+        await db.commit()
+        invalidate_principal(id, current_user.id)
+        invalidate_user_cache(id, current_user.id)
+
+    async def get_users_batch(self, request: UserIdsSchema, db: AsyncSession):
+        rows = (await db.execute(users_batch_query(request.ids))).all()
+        return users_batch(rows, request.ids)
+
+    async def deactivate_users(self, request: UserIdsSchema, db: AsyncSession):
+        ids = (await db.scalars(deactivate_users_statement(request.ids))).all()
+        await db.commit()
+        invalidate_principal(*ids)
+        invalidate_user_cache(*ids)
+        return BatchResultSchema(ids=sorted(ids))
+
+    async def delete_users(
+        self, request: UserIdsSchema, current_user: Principal, db: AsyncSession
+    ):
+        ids = (await db.scalars(delete_users_statement(request.ids))).all()
+        await db.execute(bump_token_version_statement(current_user.id))
+        await db.commit()
+        invalidate_principal(*ids, current_user.id)
+        invalidate_user_cache(*ids, current_user.id)
+        return BatchResultSchema(ids=sorted(ids))
+
+    async def update_password(
+        self, password: UpdatePasswordSchema, db: AsyncSession, current_user: Principal
+    ):
+        old_hash = await db.scalar(
+            select(UserModel.hashed_password).where(UserModel.id == current_user.id)
+        )
+        if not await verify_password_async(password.old_password, old_hash):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail=Message.PASSWORDS_DO_NOT_MATCH.value,
+            )
+        new_hash = await hash_password_async(password.new_password)
+        updated = await db.scalar(
+            update_password_statement(current_user.id, old_hash, new_hash)
+        )
+        await db.commit()
+        if not updated:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail=Message.PASSWORDS_DO_NOT_MATCH.value,
+            )
+        invalidate_principal(current_user.id)
+        invalidate_user_cache(current_user.id)
+
+    async def forget_password(self, request_user: VerifyPasssword, db: AsyncSession):
+        now = datetime.now(timezone.utc)
+        user_id = await otp_store.reset_password_async(
+            request_user.email,
+            await hash_password_async(request_user.new_password),
+            now,
+            db,
+        )
+        if user_id:
+            await db.commit()
+            invalidate_principal(user_id)
+            return {ResponseKey.MESSAGE.value: Message.PASSWORD_RESET_SUCCESS.value}
+        # Rejected: look the code up only to report why.
+        otp_record = await otp_store.get_async(request_user.email, db)
+        if (
+            otp_record
+            and otp_record.purpose == OTPPurpose.FORGOT_PASSWORD.value
+            and otp_record.is_verified
+            and (
+                not otp_record.verified_at
+                or otp_record.verified_at
+                + timedelta(minutes=RESET_PASSWORD_WINDOW_MINUTES)
+                < now
+            )
+        ):
+            await otp_store.delete_async(request_user.email, db)
+            await db.commit()
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail=Message.OTP_WINDOW_EXPIRED.value,
+            )
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail=Message.OTP_REQUIRED.value
+        )
+
+    async def send_otp(self, request_user: OTPRequest, db: AsyncSession):
+        now = datetime.now(timezone.utc)
+        user = await db.scalar(
+            select(UserModel).where(user_email_is(request_user.email))
+        )
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=Message.USER_DOES_NOT_EXIST.value,
+            )
+        try:
+            purpose = OTPPurpose(request_user.purpose).value
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                detail=Message.INVALID_OTP_PURPOSE.value,
+            )
+        if user.is_email_verified and purpose == OTPPurpose.EMAIL_VERIFICATION.value:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=Message.EMAIL_ALREADY_VERIFIED.value,
+            )
+        if not user.is_email_verified and purpose == OTPPurpose.FORGOT_PASSWORD.value:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=Message.EMAIL_VERIFICATION_PURPOSE_MISMATCH,
+            )
+        otp_record = await otp_store.get_async(request_user.email, db)
+        if otp_record and otp_record.otp_expiry and otp_record.otp_expiry > now:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=Message.OTP_ALREADY_SENT.value,
+            )
+        otp = generate_otp()
+        await otp_store.save_async(
+            OTPRecord(
+                email=request_user.email,
+                otp=otp,
+                purpose=purpose,
+                otp_expiry=now + timedelta(seconds=OTP_EXPIRY_SECONDS),
+            ),
+            db,
+        )
+        await db.commit()
+        return {
+            ResponseKey.MESSAGE.value: Message.OTP_SENT.value,
+            ResponseKey.OTP.value: otp,
+            ResponseKey.EXPIRES_IN.value: OTP_EXPIRY_SECONDS,
+        }
+
+    async def verify_otp(self, request_user: VerifyOTP, db: AsyncSession):
+        now = datetime.now(timezone.utc)
+        if await otp_store.verify_async(request_user.email, request_user.otp, now, db):
+            await db.commit()
+            return {ResponseKey.MESSAGE.value: Message.OTP_VERIFIED.value}
+        # Rejected: look the code up only to report why.
+        otp_record = await otp_store.get_async(request_user.email, db)
+        if not otp_record:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=Message.OTP_NOT_FOUND.value,
+            )
+        if otp_record.otp != request_user.otp:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=Message.OTP_INVALID.value,
+            )
+        if not otp_record.otp_expiry or otp_record.otp_expiry < now:
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE, detail=Message.OTP_EXPIRED.value
+            )
+        if not await db.scalar(select(user_exists(request_user.email))):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=Message.USER_DOES_NOT_EXIST.value,
+            )
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=Message.OTP_NOT_FOUND.value,
+        )
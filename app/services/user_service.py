@@ -1,17 +1,35 @@
 from datetime import datetime, timedelta, timezone
 from fastapi import HTTPException, status
+from sqlalchemy import Integer, any_, bindparam, delete, func, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
 
-from app.core.constants import RESET_PASSWORD_WINDOW_MINUTES
-from app.schemas.response import ResponseUserSchema, UsersSchema
-from app.utils.login_util import hash_password, verify_password
+from app.core.constants import (
+    OTP_EXPIRY_SECONDS,
+    RESET_PASSWORD_WINDOW_MINUTES,
+    USERS_EXPORT_BATCH_SIZE,
+    USERS_PAGE_DEFAULT_LIMIT,
+)
+from app.core.enums import ExportFormat
+from app.schemas.response import (
+    BatchResultSchema,
+    BatchUsersSchema,
+    ResponseUserSchema,
+    UsersSchema,
+)
+from app.utils.hashing import hash_password, verify_password
 from app.utils.otp import generate_otp
-from app.database.models import UserModel, OTPModel
+from app.utils.otp_store import OTPRecord, otp_store, user_exists
+from app.utils.principal_cache import Principal, invalidate_principal
+from app.utils.export import export_chunk, export_header
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.database.models import UserModel, user_email_is
+from app.middleware.middleware import invalidate_user_cache
 from app.schemas.request import (
     OTPRequest,
     RegisterUserSchema,
     UpdatePasswordSchema,
+    UserIdsSchema,
     UserUpdateSchema,
     VerifyOTP,
     VerifyPasssword,
@@ -21,111 +39,297 @@ from app.core.messages import Message
 from app.core.response_keys import ResponseKey
 
 
+def users_page_query(limit: int, after: str | None = None):
+    # Keyset pagination: each page is a primary key range seek, so deep pages
+    # cost the same as the first one.
+    query = (
+        select(UserModel.id, UserModel.first_name, UserModel.last_name, UserModel.email)
+        .order_by(UserModel.id)
+        .limit(limit + 1)
+    )
+    if after:
+        query = query.where(UserModel.id > decode_cursor(after))
+    return query
+
+
+def users_page(rows, limit: int) -> UsersSchema:
+    next_cursor = encode_cursor(rows[limit - 1].id) if len(rows) > limit else None
+    return UsersSchema(
+        users=[ResponseUserSchema.model_validate(row) for row in rows[:limit]],
+        next_cursor=next_cursor,
+    )
+
+
+def users_export_query():
+    # yield_per switches the ORM to a server-side cursor, so rows are pulled
+    # from Postgres one batch at a time instead of being buffered up front.
+    return (
+        select(UserModel.id, UserModel.first_name, UserModel.last_name, UserModel.email)
+        .order_by(UserModel.id)
+        .execution_options(yield_per=USERS_EXPORT_BATCH_SIZE)
+    )
+
+
+def ids_match(ids: list[int]):
+    # A single array parameter keeps the statement text identical for every
+    # batch size, unlike IN (...) which expands to one placeholder per id.
+    return UserModel.id == any_(bindparam("ids", sorted(set(ids)), ARRAY(Integer)))
+
+
+def users_batch_query(ids: list[int]):
+    return (
+        select(UserModel.id, UserModel.first_name, UserModel.last_name, UserModel.email)
+        .where(ids_match(ids))
+        .order_by(UserModel.id)
+    )
+
+
+def users_batch(rows, ids: list[int]) -> BatchUsersSchema:
+    found = {row.id for row in rows}
+    return BatchUsersSchema(
+        users=[ResponseUserSchema.model_validate(row) for row in rows],
+        missing=sorted(set(ids) - found),
+    )
+
+
+def deactivate_users_statement(ids: list[int]):
+    return (
+        update(UserModel)
+        .where(ids_match(ids), UserModel.is_active)
+        .values(is_active=False, token_version=UserModel.token_version + 1)
+        .returning(UserModel.id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def delete_users_statement(ids: list[int]):
+    return (
+        delete(UserModel)
+        .where(ids_match(ids))
+        .returning(UserModel.id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+USER_COLUMNS = (
+    UserModel.id,
+    UserModel.first_name,
+    UserModel.last_name,
+    UserModel.email,
+)
+
+
+def user_version_query(user_id: int):
+    return select(UserModel.updated_at).where(UserModel.id == user_id)
+
+
+def user_with_version_query(user_id: int):
+    return select(*USER_COLUMNS, UserModel.updated_at).where(UserModel.id == user_id)
+
+
+def users_version_query():
+    # The collection validator: any insert, update or delete changes it.
+    return select(func.count(), func.max(UserModel.updated_at))
+
+
+def user_not_found() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=Message.USER_NOT_FOUND.value,
+    )
+
+
+def create_user_statement(values: dict):
+    # ON CONFLICT on uq_users_email_lower turns a duplicate email into "no row
+    # returned" instead of an IntegrityError and a rollback; any other unique
+    # violation still raises.
+    return (
+        insert(UserModel)
+        .values(**values)
+        .on_conflict_do_nothing(index_elements=[func.lower(UserModel.email)])
+        .returning(*USER_COLUMNS)
+    )
+
+
+def update_user_statement(user_id: int, values: dict):
+    return (
+        update(UserModel)
+        .where(UserModel.id == user_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def update_password_statement(user_id: int, old_hash: str, new_hash: str):
+    # Compare-and-set on the hash that was verified, so a concurrent change
+    # cannot be silently overwritten.
+    return (
+        update(UserModel)
+        .where(UserModel.id == user_id, UserModel.hashed_password == old_hash)
+        .values(hashed_password=new_hash, token_version=UserModel.token_version + 1)
+        .returning(UserModel.id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def bump_token_version_statement(user_id: int):
+    return (
+        update(UserModel)
+        .where(UserModel.id == user_id)
+        .values(token_version=UserModel.token_version + 1)
+    )
+
+
 class UserService:
     def create_user(self, user: RegisterUserSchema, db: Session):
-        try:
-            hashed_password = hash_password(user.password)
-            user_model = user.model_dump()
-            user_model.pop(ResponseKey.PASSWORD.value)
-            new_user = UserModel(**user_model, hashed_password=hashed_password)
-            db.add(new_user)
-            db.commit()
-            db.refresh(new_user)
-            return ResponseUserSchema.model_validate(new_user)
-        except IntegrityError:
-            db.rollback()
+        user_model = user.model_dump()
+        user_model.pop(ResponseKey.PASSWORD.value)
+        user_model["hashed_password"] = hash_password(user.password)
+        new_user = db.execute(create_user_statement(user_model)).first()
+        db.commit()
+        if not new_user:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail=Message.USER_ALREADY_EXISTS.value,
             )
+        invalidate_user_cache(new_user.id)
+        return ResponseUserSchema.model_validate(new_user)
+
+    def get_all_user(
+        self,
+        db: Session,
+        limit: int = USERS_PAGE_DEFAULT_LIMIT,
+        after: str | None = None,
+    ):
+        rows = db.execute(users_page_query(limit=limit, after=after)).all()
+        return users_page(rows, limit)
+
+    def export_users(self, fmt: ExportFormat, db: Session):
+        yield export_header(fmt)
+        result = db.execute(users_export_query())
+        for rows in result.partitions():
+            yield export_chunk(rows, fmt)
 
-    def get_all_user(self, db: Session):
-        users = db.query(UserModel).all()
-        return UsersSchema(users=[ResponseUserSchema.model_validate(u) for u in users])
+    def get_users_version(self, db: Session) -> tuple[int, datetime | None]:
+        return tuple(db.execute(users_version_query()).one())
 
     def get_user(self, id: int, db: Session):
-        user = db.query(UserModel).filter(UserModel.id == id).first()
+        return self.get_user_with_version(id=id, db=db)[0]
+
+    def get_user_with_version(
+        self, id: int, db: Session
+    ) -> tuple[ResponseUserSchema, datetime]:
+        user = db.execute(user_with_version_query(id)).first()
         if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=Message.USER_NOT_FOUND.value,
-            )
-        return ResponseUserSchema.model_validate(user)
+            raise user_not_found()
+        return ResponseUserSchema.model_validate(user), user.updated_at
+
+    def get_user_version(self, id: int, db: Session) -> datetime:
+        updated_at = db.scalar(user_version_query(id))
+        if updated_at is None:
+            raise user_not_found()
+        return updated_at
 
     def update_user(
-        self, details: UserUpdateSchema, current_user: UserModel, db: Session
+        self, details: UserUpdateSchema, current_user: Principal, db: Session
     ):
-        for key, value in details.model_dump(exclude_unset=True).items():
-            setattr(current_user, key, value)
-        db.commit()
-        db.refresh(current_user)
+        values = details.model_dump(exclude_unset=True)
+        if values:
+            db.execute(update_user_statement(current_user.id, values))
+            db.commit()
+        invalidate_user_cache(current_user.id)
 
-    def delete_user(self, id: int, current_user: UserModel, db: Session):
-        user = db.query(UserModel).get(id)
-        if not user:
+    def delete_user(self, id: int, current_user: Principal, db: Session):
+        if not db.scalars(delete_users_statement([id])).first():
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=Message.USER_NOT_FOUND.value,
             )
-        db.delete(user)
-        current_user.token_version += 1
+        db.execute(bump_token_version_statement(current_user.id))
         db.commit()
+        invalidate_principal(id, current_user.id)
+        invalidate_user_cache(id, current_user.id)
+
+    def get_users_batch(self, request: UserIdsSchema, db: Session):
+        rows = db.execute(users_batch_query(request.ids)).all()
+        return users_batch(rows, request.ids)
+
+    def deactivate_users(self, request: UserIdsSchema, db: Session):
+        ids = db.scalars(deactivate_users_statement(request.ids)).all()
+        db.commit()
+        invalidate_principal(*ids)
+        invalidate_user_cache(*ids)
+        return BatchResultSchema(ids=sorted(ids))
+
+    def delete_users(
+        self, request: UserIdsSchema, current_user: Principal, db: Session
+    ):
+        ids = db.scalars(delete_users_statement(request.ids)).all()
+        db.execute(bump_token_version_statement(current_user.id))
+        db.commit()
+        invalidate_principal(*ids, current_user.id)
+        invalidate_user_cache(*ids, current_user.id)
+        return BatchResultSchema(ids=sorted(ids))
 
     def update_password(
-        self, password: UpdatePasswordSchema, db: Session, current_user: UserModel
+        self, password: UpdatePasswordSchema, db: Session, current_user: Principal
     ):
-        if not verify_password(password.old_password, current_user.hashed_password):
+        old_hash = db.scalar(
+            select(UserModel.hashed_password).where(UserModel.id == current_user.id)
+        )
+        if not verify_password(password.old_password, old_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail=Message.PASSWORDS_DO_NOT_MATCH.value,
             )
-        current_user.hashed_password = hash_password(password.new_password)
-        current_user.token_version += 1
+        new_hash = hash_password(password.new_password)
+        updated = db.scalar(
+            update_password_statement(current_user.id, old_hash, new_hash)
+        )
         db.commit()
-        db.refresh(current_user)
+        if not updated:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail=Message.PASSWORDS_DO_NOT_MATCH.value,
+            )
+        invalidate_principal(current_user.id)
+        invalidate_user_cache(current_user.id)
 
     def forget_password(self, request_user: VerifyPasssword, db: Session):
         now = datetime.now(timezone.utc)
-        otp_record = (
-            db.query(OTPModel)
-            .filter(
-                OTPModel.email == request_user.email,
-                OTPModel.purpose == OTPPurpose.FORGOT_PASSWORD.value,
-                OTPModel.is_verified,
-            )
-            .first()
+        user_id = otp_store.reset_password(
+            request_user.email, hash_password(request_user.new_password), now, db
         )
-        if not otp_record:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN, detail=Message.OTP_REQUIRED.value
-            )
+        if user_id:
+            db.commit()
+            invalidate_principal(user_id)
+            return {ResponseKey.MESSAGE.value: Message.PASSWORD_RESET_SUCCESS.value}
+        # Rejected: look the code up only to report why.
+        otp_record = otp_store.get(request_user.email, db)
         if (
-            not otp_record.verified_at
-            or otp_record.verified_at + timedelta(minutes=RESET_PASSWORD_WINDOW_MINUTES)
-            < now
+            otp_record
+            and otp_record.purpose == OTPPurpose.FORGOT_PASSWORD.value
+            and otp_record.is_verified
+            and (
+                not otp_record.verified_at
+                or otp_record.verified_at
+                + timedelta(minutes=RESET_PASSWORD_WINDOW_MINUTES)
+                < now
+            )
         ):
-            db.delete(otp_record)
+            otp_store.delete(request_user.email, db)
             db.commit()
             raise HTTPException(
                 status_code=status.HTTP_410_GONE,
                 detail=Message.OTP_WINDOW_EXPIRED.value,
             )
-        user = db.query(UserModel).filter(UserModel.email == request_user.email).first()
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=Message.USER_ALREADY_EXISTS.value,
-            )
-        user.hashed_password = hash_password(request_user.new_password)
-        user.token_version += 1
-        db.delete(otp_record)
-        db.commit()
-        db.refresh(user)
-        return {ResponseKey.MESSAGE.value: Message.PASSWORD_RESET_SUCCESS.value}
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail=Message.OTP_REQUIRED.value
+        )
 
     def send_otp(self, request_user: OTPRequest, db: Session):
         now = datetime.now(timezone.utc)
-        user = db.query(UserModel).filter(UserModel.email == request_user.email).first()
+        user = db.query(UserModel).filter(user_email_is(request_user.email)).first()
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -148,40 +352,36 @@ class UserService:
                 status_code=status.HTTP_409_CONFLICT,
                 detail=Message.EMAIL_VERIFICATION_PURPOSE_MISMATCH,
             )
-        otp_record = (
-            db.query(OTPModel).filter(OTPModel.email == request_user.email).first()
-        )
+        otp_record = otp_store.get(request_user.email, db)
         if otp_record and otp_record.otp_expiry and otp_record.otp_expiry > now:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail=Message.OTP_ALREADY_SENT.value,
             )
         otp = generate_otp()
-        expiry = now + timedelta(minutes=5)
-        if otp_record:
-            otp_record.otp = otp
-            otp_record.otp_expiry = expiry
-            otp_record.purpose = purpose
-            otp_record.is_verified = False
-            otp_record.verified_at = None
-        else:
-            otp_record = OTPModel(
-                email=request_user.email, purpose=purpose, otp=otp, otp_expiry=expiry
-            )
-            db.add(otp_record)
+        otp_store.save(
+            OTPRecord(
+                email=request_user.email,
+                otp=otp,
+                purpose=purpose,
+                otp_expiry=now + timedelta(seconds=OTP_EXPIRY_SECONDS),
+            ),
+            db,
+        )
         db.commit()
-        db.refresh(otp_record)
         return {
             ResponseKey.MESSAGE.value: Message.OTP_SENT.value,
             ResponseKey.OTP.value: otp,
-            ResponseKey.EXPIRES_IN.value: 300,
+            ResponseKey.EXPIRES_IN.value: OTP_EXPIRY_SECONDS,
         }
 
     def verify_otp(self, request_user: VerifyOTP, db: Session):
         now = datetime.now(timezone.utc)
-        otp_record = (
-            db.query(OTPModel).filter(OTPModel.email == request_user.email).first()
-        )
+        if otp_store.verify(request_user.email, request_user.otp, now, db):
+            db.commit()
+            return {ResponseKey.MESSAGE.value: Message.OTP_VERIFIED.value}
+        # Rejected: look the code up only to report why.
+        otp_record = otp_store.get(request_user.email, db)
         if not otp_record:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -196,17 +396,12 @@ class UserService:
             raise HTTPException(
                 status_code=status.HTTP_410_GONE, detail=Message.OTP_EXPIRED.value
             )
-        otp_record.is_verified = True
-        otp_record.verified_at = now
-        user = db.query(UserModel).filter(UserModel.email == request_user.email).first()
-        if not user:
+        if not db.scalar(select(user_exists(request_user.email))):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=Message.USER_DOES_NOT_EXIST.value,
             )
-        if otp_record.purpose == OTPPurpose.EMAIL_VERIFICATION.value:
-            user.is_email_verified = True
-            db.delete(otp_record)
-        db.commit()
-        db.refresh(user)
-        return {ResponseKey.MESSAGE.value: Message.OTP_VERIFIED.value}
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=Message.OTP_NOT_FOUND.value,
+        )
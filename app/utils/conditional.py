@@ -0,0 +1,83 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response, status
+
+
+def _micros(moment: datetime) -> int:
+    return int(moment.timestamp()) * 1_000_000 + moment.microsecond
+
+
+def _validators(etag: str, last_modified: datetime | None) -> dict[str, str]:
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(
+            last_modified.astimezone(timezone.utc), usegmt=True
+        )
+    return headers
+
+
+def user_validators(user_id: int, updated_at: datetime) -> dict[str, str]:
+    # updated_at changes on every write to the row, so it identifies the
+    # representation as well as a hash of the body would.
+    return _validators(f'"{user_id}-{_micros(updated_at):x}"', updated_at)
+
+
+def users_validators(
+    limit: int, after: str | None, total: int, last_modified: datetime | None
+) -> dict[str, str]:
+    # Inserts raise max(updated_at) and the row count, updates raise
+    # max(updated_at) and deletes lower the row count.
+    version = _micros(last_modified) if last_modified else 0
+    digest = hashlib.sha256(f"{limit}:{after}:{total}:{version}".encode())
+    return _validators(f'"{digest.hexdigest()[:32]}"', last_modified)
+
+
+def has_preconditions(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison: W/ prefixes are ignored.
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag.removeprefix("W/") in candidates
+
+
+def _not_modified_since(if_modified_since: str, last_modified: str | None) -> bool:
+    if last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    return parsedate_to_datetime(last_modified) <= since
+
+
+def not_modified(request: Request, headers) -> Response | None:
+    """A 304 response when the request's validators match ``headers``.
+
+    If-Modified-Since is only consulted when If-None-Match is absent.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        matched = _etag_matches(if_none_match, headers["ETag"])
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        matched = if_modified_since is not None and _not_modified_since(
+            if_modified_since, headers.get("Last-Modified")
+        )
+    if not matched:
+        return None
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={
+            name: headers[name]
+            for name in ("ETag", "Last-Modified")
+            if headers.get(name) is not None
+        },
+    )
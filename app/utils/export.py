@@ -0,0 +1,29 @@
+import csv
+import io
+import json
+
+from app.core.enums import ExportFormat
+
+EXPORT_FIELDS = ("id", "first_name", "last_name", "email")
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+
+def export_header(fmt: ExportFormat) -> str:
+    if fmt == ExportFormat.CSV:
+        return ",".join(EXPORT_FIELDS) + "\r\n"
+    return ""
+
+
+def export_chunk(rows, fmt: ExportFormat) -> str:
+    if fmt == ExportFormat.CSV:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue()
+    return "".join(
+        json.dumps(dict(zip(EXPORT_FIELDS, row)), separators=(",", ":")) + "\n"
+        for row in rows
+    )
@@ -0,0 +1,209 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from prometheus_client import Counter, Gauge, Histogram
+from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+from app.config.config import setting
+from app.core.messages import Message
+
+# Worker processes are spawned and import this module to run _hash and
+# _verify, so it only imports settings and messages from the app, never the
+# database or routes. Tune the costs with ``python -m app.cli.calibrate_argon2``;
+# existing hashes are upgraded on login.
+ARGON2_PARAMS = {
+    "time_cost": setting.argon2_time_cost,
+    "memory_cost": setting.argon2_memory_cost,
+    "parallelism": setting.argon2_parallelism,
+}
+password_hash = PasswordHash((Argon2Hasher(**ARGON2_PARAMS),))
+
+PASSWORD_HASH_QUEUE_DEPTH = Gauge(
+    "password_hash_queue_depth",
+    "Password hash/verify jobs submitted and not yet finished",
+    multiprocess_mode="livesum",
+)
+PASSWORD_HASH_SECONDS = Histogram(
+    "password_hash_seconds",
+    "Password hash/verify latency including time spent queued",
+    ["operation", *ARGON2_PARAMS],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "password_hash_rejected",
+    "Password jobs rejected with 503 because the queue was full",
+)
+PASSWORD_REHASHED = Counter(
+    "password_rehashed",
+    "Stored hashes upgraded to the current argon2 parameters on login",
+    list(ARGON2_PARAMS),
+)
+
+
+def _hash(plain_password: str) -> str:
+    return password_hash.hash(plain_password)
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return password_hash.verify(plain_password, hashed_password)
+
+
+def _verify_and_update(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    return password_hash.verify_and_update(plain_password, hashed_password)
+
+
+class PasswordHashExecutor:
+    """Runs argon2 in worker processes with a bounded number of pending jobs.
+
+    ``workers=0`` runs ``run`` jobs inline in the calling thread and
+    ``run_async`` jobs in the threadpool, still bounded.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pool: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self, broken: ProcessPoolExecutor | None = None):
+        with self._lock:
+            if self._pool is None or self._pool is broken:
+                # Lives until shutdown(), so it cannot be a with block.
+                self._pool = ProcessPoolExecutor(  # pylint: disable=consider-using-with
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    def _start(self, fn, *args) -> Future:
+        pool = self._get_pool()
+        try:
+            return pool.submit(fn, *args)
+        except BrokenProcessPool:
+            return self._get_pool(broken=pool).submit(fn, *args)
+
+    def _acquire(self) -> None:
+        # Released by _release(); a full queue is rejected instead of waited on.
+        if not self._slots.acquire(blocking=False):  # pylint: disable=consider-using-with
+            PASSWORD_HASH_REJECTED.inc()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=Message.PASSWORD_HASHING_BUSY.value,
+                headers={"Retry-After": "1"},
+            )
+        PASSWORD_HASH_QUEUE_DEPTH.inc()
+
+    def _release(self) -> None:
+        self._slots.release()
+        PASSWORD_HASH_QUEUE_DEPTH.dec()
+
+    def _observe(self, operation: str, start: float) -> None:
+        PASSWORD_HASH_SECONDS.labels(operation=operation, **ARGON2_PARAMS).observe(
+            time.perf_counter() - start
+        )
+
+    def submit(self, operation: str, fn, *args) -> Future:
+        self._acquire()
+        start = time.perf_counter()
+
+        def finished(_future: Future) -> None:
+            self._release()
+            self._observe(operation, start)
+
+        try:
+            future = self._start(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(finished)
+        return future
+
+    @contextmanager
+    def _inline(self, operation: str):
+        self._acquire()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._release()
+            self._observe(operation, start)
+
+    def run(self, operation: str, fn, *args):
+        if self.workers > 0:
+            return self.submit(operation, fn, *args).result()
+        with self._inline(operation):
+            return fn(*args)
+
+    async def run_async(self, operation: str, fn, *args):
+        if self.workers > 0:
+            return await asyncio.wrap_future(self.submit(operation, fn, *args))
+        with self._inline(operation):
+            return await run_in_threadpool(fn, *args)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True, cancel_futures=True)
+                self._pool = None
+
+
+password_executor = PasswordHashExecutor(
+    workers=setting.password_hash_workers,
+    max_pending=setting.password_hash_max_pending,
+)
+
+
+def hash_password(plain_password: str) -> str:
+    return password_executor.run("hash", _hash, plain_password)
+
+
+def hash_passwords(passwords: list[str], pool=None, chunksize: int = 1) -> list[str]:
+    # For batch jobs that bring their own multiprocessing pool and so bypass
+    # password_executor; without a pool the batch is hashed in this process.
+    if pool is None:
+        return [_hash(password) for password in passwords]
+    return pool.map(_hash, passwords, chunksize=chunksize)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return password_executor.run("verify", _verify, plain_password, hashed_password)
+
+
+async def hash_password_async(plain_password: str) -> str:
+    return await password_executor.run_async("hash", _hash, plain_password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_executor.run_async(
+        "verify", _verify, plain_password, hashed_password
+    )
+
+
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    return password_executor.run(
+        "verify", _verify_and_update, plain_password, hashed_password
+    )
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    return await password_executor.run_async(
+        "verify", _verify_and_update, plain_password, hashed_password
+    )
+
+
+def record_rehash() -> None:
+    PASSWORD_REHASHED.labels(**ARGON2_PARAMS).inc()
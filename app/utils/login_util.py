@@ -1,29 +1,32 @@
+import hashlib
+import time
+
 import jwt
 from fastapi import Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from datetime import datetime, timedelta, timezone
 from fastapi.security import OAuth2PasswordBearer
-from pwdlib import PasswordHash
 
 
-from app.database.db import get_db
+from app.database.db import get_async_db, get_db
 from app.database.models import UserModel
 from app.config.config import setting
 from app.core.auth_constants import TokenClaim, AuthHeader, AuthRoute
 from app.core.response_keys import ResponseKey
 from app.core.messages import Message
+from app.utils.cache import TTLCache
+from app.utils.principal_cache import Principal, principal_cache
 
-password_hash = PasswordHash.recommended()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=AuthRoute.TOKEN_URL.value)
 
-
-def hash_password(plain_password: str) -> str:
-    return password_hash.hash(plain_password)
-
-
-def verify_password(plain_password: str, hashed_password: str) -> str:
-    return password_hash.verify(plain_password, hashed_password)
+# Claims of tokens whose signature has already been checked, keyed by the
+# SHA-256 of the raw token and expiring at the token's own exp claim.
+token_cache = TTLCache(
+    name="jwt", maxsize=setting.token_cache_max_entries, ttl=setting.token_cache_ttl
+)
 
 
 def create_access_token(
@@ -41,12 +44,20 @@ def create_access_token(
 
 
 def verify_access_token(token: str, credentital_exception):
+    digest = hashlib.sha256(token.encode()).digest()
+    claims = token_cache.get(digest)
+    if claims is not None:
+        return claims
     try:
         decoded_token = jwt.decode(token, setting.secret_key, setting.algorithm)
         user_id = decoded_token.get(TokenClaim.USER_ID.value)
         token_version = decoded_token.get(TokenClaim.TOKEN_VERSION.value)
         if not user_id or token_version is None:
             raise credentital_exception
+        expiry = decoded_token.get(TokenClaim.EXPIRY.value)
+        if expiry is not None:
+            ttl = min(expiry - time.time(), token_cache.ttl)
+            token_cache.set(digest, (user_id, token_version), ttl=ttl)
         return user_id, token_version
     except jwt.InvalidTokenError:
         raise credentital_exception
@@ -54,20 +65,62 @@ def verify_access_token(token: str, credentital_exception):
         raise credentital_exception
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
-):
-    credential_exception = HTTPException(
+def _credential_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail=Message.INVALID_CREDS.value,
         headers={AuthHeader.WWW_AUTHENTICATE.value: AuthHeader.BEARER.value},
     )
-    user_id, token_version = verify_access_token(token, credential_exception)
-    user = db.query(UserModel).filter(UserModel.id == user_id).first()
-    if not user:
+
+
+PRINCIPAL_COLUMNS = (UserModel.id, UserModel.token_version, UserModel.is_active)
+
+
+def _check_principal(
+    principal: Principal | None, token_version: int, credential_exception
+):
+    if not principal:
         raise credential_exception
-    if user.token_version != token_version:
+    if principal.token_version != token_version:
         raise credential_exception
-    if not user.is_active:
+    if not principal.is_active:
         raise credential_exception
-    return user
+    return principal
+
+
+def _load_principal(row) -> Principal | None:
+    if not row:
+        return None
+    principal = Principal(
+        id=row.id, token_version=row.token_version, is_active=bool(row.is_active)
+    )
+    principal_cache.set(principal.id, principal)
+    return principal
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+) -> Principal:
+    credential_exception = _credential_exception()
+    user_id, token_version = verify_access_token(token, credential_exception)
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        row = db.execute(
+            select(*PRINCIPAL_COLUMNS).where(UserModel.id == user_id)
+        ).first()
+        principal = _load_principal(row)
+    return _check_principal(principal, token_version, credential_exception)
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    credential_exception = _credential_exception()
+    user_id, token_version = verify_access_token(token, credential_exception)
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        row = (
+            await db.execute(select(*PRINCIPAL_COLUMNS).where(UserModel.id == user_id))
+        ).first()
+        principal = _load_principal(row)
+    return _check_principal(principal, token_version, credential_exception)
@@ -0,0 +1,59 @@
+import logging
+import os
+import re
+
+from prometheus_client import multiprocess
+
+logger = logging.getLogger("api")
+
+# prometheus_client reads this at import time; when it is set every worker
+# writes its samples to mmap files there and the Instrumentator's /metrics
+# endpoint sums them with a MultiProcessCollector.
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+# counter_1234.db, histogram_1234.db, gauge_livesum_1234.db, ...
+_WORKER_FILE = re.compile(r"_(\d+)\.db$")
+
+
+def multiprocess_dir() -> str | None:
+    return os.environ.get(MULTIPROC_DIR_ENV)
+
+
+def pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def cleanup_dead_workers(path: str | None = None) -> list[int]:
+    """Remove the live gauge files of workers that are no longer running.
+
+    Counter and histogram files of dead workers are kept on purpose: their
+    samples are part of the totals, and dropping them would make counters go
+    backwards. The directory itself should be emptied before the server
+    starts, since a reused pid would otherwise pick up the old values.
+    """
+    path = path or multiprocess_dir()
+    if not path:
+        return []
+    pids = {
+        int(match.group(1))
+        for name in os.listdir(path)
+        if (match := _WORKER_FILE.search(name))
+    }
+    dead = sorted(pid for pid in pids if not pid_alive(pid))
+    for pid in dead:
+        multiprocess.mark_process_dead(pid, path)
+    if dead:
+        logger.info(f"Cleared live gauges of dead metrics workers {dead}")
+    return dead
+
+
+def mark_worker_exited() -> None:
+    path = multiprocess_dir()
+    if path:
+        multiprocess.mark_process_dead(os.getpid(), path)
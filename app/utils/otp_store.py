@@ -0,0 +1,479 @@
+import json
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, replace
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, delete, exists, select, union_all, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config.config import setting
+from app.core.constants import RESET_PASSWORD_WINDOW_MINUTES
+from app.core.enums import OTPPurpose, OTPStoreBackend
+from app.database.models import OTPModel, UserModel, user_email_is
+from app.database.redis import get_async_redis, get_redis
+from app.utils.cache import TTLCache
+
+RESET_WINDOW = timedelta(minutes=RESET_PASSWORD_WINDOW_MINUTES)
+# Records outlive their deadline by one reset window so that late requests
+# still get "expired" rather than "not found", exactly as with the table.
+RETENTION_GRACE = RESET_WINDOW
+
+
+@dataclass(frozen=True)
+class OTPRecord:
+    email: str
+    otp: str | None
+    purpose: str | None
+    otp_expiry: datetime | None
+    is_verified: bool = False
+    verified_at: datetime | None = None
+
+    def ttl(self, now: datetime | None = None) -> float:
+        """Seconds this record is worth keeping."""
+        now = now or datetime.now(timezone.utc)
+        if self.is_verified and self.verified_at:
+            deadline = self.verified_at + RESET_WINDOW
+        else:
+            deadline = self.otp_expiry or now
+        return (deadline + RETENTION_GRACE - now).total_seconds()
+
+    def accepts(self, otp: str, now: datetime) -> bool:
+        return self.otp == otp and bool(self.otp_expiry and self.otp_expiry >= now)
+
+    def allows_reset(self, now: datetime) -> bool:
+        return (
+            self.purpose == OTPPurpose.FORGOT_PASSWORD.value
+            and self.is_verified
+            and bool(self.verified_at and self.verified_at + RESET_WINDOW >= now)
+        )
+
+    def after_verify(self, now: datetime) -> "OTPRecord | None":
+        """What to keep once this code is verified; None drops it."""
+        if self.purpose == OTPPurpose.EMAIL_VERIFICATION.value:
+            return None
+        return replace(self, is_verified=True, verified_at=now)
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        for key in ("otp_expiry", "verified_at"):
+            if data[key]:
+                data[key] = data[key].isoformat()
+        return json.dumps(data)
+
+    @classmethod
+    def from_json(cls, raw: bytes | str) -> "OTPRecord":
+        data = json.loads(raw)
+        for key in ("otp_expiry", "verified_at"):
+            if data[key]:
+                data[key] = datetime.fromisoformat(data[key])
+        return cls(**data)
+
+
+def user_exists(email: str):
+    return exists().where(user_email_is(email))
+
+
+def mark_email_verified_statement(email: str):
+    return (
+        update(UserModel)
+        .where(user_email_is(email))
+        .values(is_email_verified=True)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def reset_password_statement(email: str, hashed_password: str):
+    return (
+        update(UserModel)
+        .where(user_email_is(email))
+        .values(
+            hashed_password=hashed_password,
+            token_version=UserModel.token_version + 1,
+        )
+        .returning(UserModel.id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+class OTPStore(ABC):
+    """Keeps one pending OTP per email; the caller commits ``db``."""
+
+    @abstractmethod
+    def get(self, email: str, db: Session) -> OTPRecord | None: ...
+
+    @abstractmethod
+    def save(self, record: OTPRecord, db: Session) -> None: ...
+
+    @abstractmethod
+    def delete(self, email: str, db: Session) -> None: ...
+
+    @abstractmethod
+    def verify(self, email: str, otp: str, now: datetime, db: Session) -> str | None:
+        """Redeem ``otp`` and return its purpose, or None if it was not accepted.
+
+        A code whose user no longer exists is not accepted and not consumed.
+        """
+
+    @abstractmethod
+    def reset_password(
+        self, email: str, hashed_password: str, now: datetime, db: Session
+    ) -> int | None:
+        """Consume a verified reset code and return the updated user id."""
+
+    async def get_async(self, email: str, db: AsyncSession) -> OTPRecord | None:
+        return self.get(email, db)
+
+    async def save_async(self, record: OTPRecord, db: AsyncSession) -> None:
+        self.save(record, db)
+
+    async def delete_async(self, email: str, db: AsyncSession) -> None:
+        self.delete(email, db)
+
+    @abstractmethod
+    async def verify_async(
+        self, email: str, otp: str, now: datetime, db: AsyncSession
+    ) -> str | None: ...
+
+    @abstractmethod
+    async def reset_password_async(
+        self, email: str, hashed_password: str, now: datetime, db: AsyncSession
+    ) -> int | None: ...
+
+
+class KeyValueOTPStore(OTPStore):
+    """A store keeping whole records under the email, outside the database.
+
+    Subclasses provide ``_redeem`` and ``_take``, which atomically check a
+    record and replace or remove it. The user row is then updated through
+    the request's session.
+    """
+
+    @abstractmethod
+    def _redeem(self, email, check, now) -> OTPRecord | None:
+        """Apply ``after_verify`` to the record if ``check`` accepts it."""
+
+    @abstractmethod
+    def _take(self, email, check) -> OTPRecord | None:
+        """Remove the record if ``check`` accepts it."""
+
+    def verify(self, email, otp, now, db):
+        if not db.scalar(select(user_exists(email))):
+            return None
+        record = self._redeem(email, lambda r: r.accepts(otp, now), now)
+        if record is None:
+            return None
+        if record.purpose == OTPPurpose.EMAIL_VERIFICATION.value:
+            db.execute(mark_email_verified_statement(email))
+        return record.purpose
+
+    def reset_password(self, email, hashed_password, now, db):
+        if self._take(email, lambda r: r.allows_reset(now)) is None:
+            return None
+        return db.scalar(reset_password_statement(email, hashed_password))
+
+    async def verify_async(self, email, otp, now, db):
+        if not await db.scalar(select(user_exists(email))):
+            return None
+        record = self._redeem(email, lambda r: r.accepts(otp, now), now)
+        if record is None:
+            return None
+        if record.purpose == OTPPurpose.EMAIL_VERIFICATION.value:
+            await db.execute(mark_email_verified_statement(email))
+        return record.purpose
+
+    async def reset_password_async(self, email, hashed_password, now, db):
+        if self._take(email, lambda r: r.allows_reset(now)) is None:
+            return None
+        return await db.scalar(reset_password_statement(email, hashed_password))
+
+
+class MemoryOTPStore(KeyValueOTPStore):
+    """Per-process store; only suitable for a single worker."""
+
+    def __init__(self, maxsize: int):
+        self._cache = TTLCache(name="otp", maxsize=maxsize, ttl=0)
+        self._lock = threading.Lock()
+
+    def get(self, email, db=None):
+        return self._cache.get(email)
+
+    def save(self, record, db=None):
+        ttl = record.ttl()
+        if ttl > 0:
+            self._cache.set(record.email, record, ttl=ttl)
+        else:
+            self._cache.pop(record.email)
+
+    def delete(self, email, db=None):
+        self._cache.pop(email)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def _redeem(self, email, check, now):
+        with self._lock:
+            record = self._cache.get(email)
+            if record is None or not check(record):
+                return None
+            kept = record.after_verify(now)
+            if kept is None:
+                self.delete(email)
+            else:
+                self.save(kept)
+            return record
+
+    def _take(self, email, check):
+        with self._lock:
+            record = self._cache.get(email)
+            if record is None or not check(record):
+                return None
+            self.delete(email)
+            return record
+
+
+class RedisOTPStore(KeyValueOTPStore):
+    """Shared store relying on Redis key expiry to drop stale codes."""
+
+    def __init__(self, prefix: str = "otp:"):
+        self.prefix = prefix
+
+    def _key(self, email: str) -> str:
+        return f"{self.prefix}{email}"
+
+    def _ttl_ms(self, record: OTPRecord) -> int:
+        return int(record.ttl() * 1000)
+
+    def get(self, email, db=None):
+        raw = get_redis().get(self._key(email))
+        return OTPRecord.from_json(raw) if raw else None
+
+    def save(self, record, db=None):
+        ttl_ms = self._ttl_ms(record)
+        if ttl_ms > 0:
+            get_redis().set(self._key(record.email), record.to_json(), px=ttl_ms)
+        else:
+            self.delete(record.email)
+
+    def delete(self, email, db=None):
+        get_redis().delete(self._key(email))
+
+    def _redeem(self, email, check, now):
+        return self._update(email, check, lambda record: record.after_verify(now))
+
+    def _take(self, email, check):
+        return self._update(email, check, lambda record: None)
+
+    def _update(self, email, check, change) -> OTPRecord | None:
+        from redis.exceptions import WatchError
+
+        # Optimistic WATCH/MULTI: retried if the key changes underneath us.
+        key = self._key(email)
+        with get_redis().pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(key)
+                    raw = pipe.get(key)
+                    record = OTPRecord.from_json(raw) if raw else None
+                    if record is None or not check(record):
+                        pipe.unwatch()
+                        return None
+                    kept = change(record)
+                    pipe.multi()
+                    if kept is None or self._ttl_ms(kept) <= 0:
+                        pipe.delete(key)
+                    else:
+                        pipe.set(key, kept.to_json(), px=self._ttl_ms(kept))
+                    pipe.execute()
+                    return record
+                except WatchError:
+                    continue
+
+    async def _update_async(self, email, check, change) -> OTPRecord | None:
+        from redis.exceptions import WatchError
+
+        key = self._key(email)
+        async with get_async_redis().pipeline() as pipe:
+            while True:
+                try:
+                    await pipe.watch(key)
+                    raw = await pipe.get(key)
+                    record = OTPRecord.from_json(raw) if raw else None
+                    if record is None or not check(record):
+                        await pipe.unwatch()
+                        return None
+                    kept = change(record)
+                    pipe.multi()
+                    if kept is None or self._ttl_ms(kept) <= 0:
+                        pipe.delete(key)
+                    else:
+                        pipe.set(key, kept.to_json(), px=self._ttl_ms(kept))
+                    await pipe.execute()
+                    return record
+                except WatchError:
+                    continue
+
+    async def verify_async(self, email, otp, now, db):
+        if not await db.scalar(select(user_exists(email))):
+            return None
+        record = await self._update_async(
+            email,
+            lambda r: r.accepts(otp, now),
+            lambda record: record.after_verify(now),
+        )
+        if record is None:
+            return None
+        if record.purpose == OTPPurpose.EMAIL_VERIFICATION.value:
+            await db.execute(mark_email_verified_statement(email))
+        return record.purpose
+
+    async def reset_password_async(self, email, hashed_password, now, db):
+        record = await self._update_async(
+            email, lambda r: r.allows_reset(now), lambda record: None
+        )
+        if record is None:
+            return None
+        return await db.scalar(reset_password_statement(email, hashed_password))
+
+    async def get_async(self, email, db=None):
+        raw = await get_async_redis().get(self._key(email))
+        return OTPRecord.from_json(raw) if raw else None
+
+    async def save_async(self, record, db=None):
+        ttl_ms = self._ttl_ms(record)
+        if ttl_ms > 0:
+            await get_async_redis().set(
+                self._key(record.email), record.to_json(), px=ttl_ms
+            )
+        else:
+            await self.delete_async(record.email)
+
+    async def delete_async(self, email, db=None):
+        await get_async_redis().delete(self._key(email))
+
+
+OTP_COLUMNS = (
+    OTPModel.email,
+    OTPModel.otp,
+    OTPModel.purpose,
+    OTPModel.otp_expiry,
+    OTPModel.is_verified,
+    OTPModel.verified_at,
+)
+
+
+def _lookup(email: str):
+    return select(*OTP_COLUMNS).where(OTPModel.email == email)
+
+
+def _record(row) -> OTPRecord | None:
+    return OTPRecord(**row._mapping) if row else None
+
+
+def _verify_statement(email: str, otp: str, now: datetime):
+    # One statement: an email-verification code is deleted and the user row
+    # flagged, a reset code is marked verified. Every condition sits in the
+    # WHERE clauses, so a stale or reused code simply matches no rows.
+    match = and_(
+        OTPModel.email == email,
+        OTPModel.otp == otp,
+        OTPModel.otp_expiry >= now,
+        user_exists(email),
+    )
+    email_verification = OTPPurpose.EMAIL_VERIFICATION.value
+    consumed = (
+        delete(OTPModel)
+        .where(match, OTPModel.purpose == email_verification)
+        .returning(OTPModel.purpose)
+        .cte("consumed")
+    )
+    verified = (
+        update(OTPModel)
+        .where(match, OTPModel.purpose != email_verification)
+        .values(is_verified=True, verified_at=now)
+        .returning(OTPModel.purpose)
+        .cte("verified")
+    )
+    email_verified = (
+        update(UserModel)
+        .where(user_email_is(email), exists(select(consumed.c.purpose)))
+        .values(is_email_verified=True)
+        .returning(UserModel.id)
+        .cte("email_verified")
+    )
+    return union_all(select(consumed.c.purpose), select(verified.c.purpose)).add_cte(
+        email_verified
+    )
+
+
+def _reset_password_statement(email: str, hashed_password: str, now: datetime):
+    consumed = (
+        delete(OTPModel)
+        .where(
+            OTPModel.email == email,
+            OTPModel.purpose == OTPPurpose.FORGOT_PASSWORD.value,
+            OTPModel.is_verified,
+            OTPModel.verified_at >= now - RESET_WINDOW,
+        )
+        .returning(OTPModel.email)
+        .cte("consumed")
+    )
+    return reset_password_statement(email, hashed_password).where(
+        exists(select(consumed.c.email))
+    )
+
+
+def _upsert(record: OTPRecord):
+    values = asdict(record)
+    return (
+        insert(OTPModel)
+        .values(**values)
+        .on_conflict_do_update(index_elements=[OTPModel.email], set_=values)
+    )
+
+
+class DatabaseOTPStore(OTPStore):
+    """The ``otp`` table, written in the caller's transaction."""
+
+    def get(self, email, db):
+        return _record(db.execute(_lookup(email)).first())
+
+    def save(self, record, db):
+        db.execute(_upsert(record))
+
+    def delete(self, email, db):
+        db.execute(delete(OTPModel).where(OTPModel.email == email))
+
+    def verify(self, email, otp, now, db):
+        return db.scalar(_verify_statement(email, otp, now))
+
+    def reset_password(self, email, hashed_password, now, db):
+        return db.scalar(_reset_password_statement(email, hashed_password, now))
+
+    async def get_async(self, email, db):
+        return _record((await db.execute(_lookup(email))).first())
+
+    async def verify_async(self, email, otp, now, db):
+        return await db.scalar(_verify_statement(email, otp, now))
+
+    async def reset_password_async(self, email, hashed_password, now, db):
+        return await db.scalar(_reset_password_statement(email, hashed_password, now))
+
+    async def save_async(self, record, db):
+        await db.execute(_upsert(record))
+
+    async def delete_async(self, email, db):
+        await db.execute(delete(OTPModel).where(OTPModel.email == email))
+
+
+def build_otp_store(backend: OTPStoreBackend = setting.otp_store_backend) -> OTPStore:
+    if backend == OTPStoreBackend.MEMORY:
+        return MemoryOTPStore(maxsize=setting.otp_store_max_entries)
+    if backend == OTPStoreBackend.REDIS:
+        return RedisOTPStore()
+    return DatabaseOTPStore()
+
+
+otp_store = build_otp_store()
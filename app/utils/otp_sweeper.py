@@ -0,0 +1,125 @@
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+
+from prometheus_client import Counter, Histogram
+from sqlalchemy import Connection, Engine, and_, delete, or_, select, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.config.config import setting
+from app.database.db import get_engine
+from app.database.models import OTPModel
+from app.utils.otp_store import RESET_WINDOW, RETENTION_GRACE
+
+logger = logging.getLogger("api")
+
+OTP_ROWS_PURGED = Counter("otp_rows_purged", "Expired OTP rows deleted by the sweeper")
+OTP_SWEEP_SECONDS = Histogram(
+    "otp_sweep_seconds",
+    "Duration of one OTP sweep run",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+OTP_SWEEP_FAILURES = Counter("otp_sweep_failures", "OTP sweep batches that failed")
+
+# A verified code may be redeemed until verified_at + RESET_WINDOW, and
+# verified_at never exceeds otp_expiry; the store also keeps every record
+# RETENTION_GRACE past its deadline. Past this margin no request can tell a
+# row apart from a missing one.
+STALE_AFTER = RESET_WINDOW + RETENTION_GRACE
+
+
+def stale_otp_batch(now: datetime, batch_size: int):
+    cutoff = now - STALE_AFTER
+    stale = select(OTPModel.id).where(
+        or_(
+            OTPModel.otp_expiry < cutoff,
+            and_(OTPModel.otp_expiry.is_(None), OTPModel.created_at < cutoff),
+        )
+    )
+    # SKIP LOCKED lets several workers sweep at once without waiting on each
+    # other or on a request that is redeeming one of the rows.
+    ids = stale.limit(batch_size).with_for_update(skip_locked=True)
+    return delete(OTPModel).where(OTPModel.id.in_(ids.scalar_subquery()))
+
+
+def sweep_batch(
+    connection: Connection, now: datetime, batch_size: int, timeout: float
+) -> int:
+    """Delete up to ``batch_size`` stale rows in the current transaction."""
+    connection.execute(
+        text("SELECT set_config('statement_timeout', :ms, true)"),
+        {"ms": str(int(timeout * 1000))},
+    )
+    return connection.execute(stale_otp_batch(now, batch_size)).rowcount
+
+
+class OTPSweeper:
+    """Periodically deletes expired rows from the ``otp`` table."""
+
+    def __init__(
+        self,
+        engine: Engine | None,
+        interval: float,
+        batch_size: int,
+        batch_timeout: float,
+        max_batches: int,
+    ):
+        self.engine = engine
+        self.interval = interval
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self.max_batches = max_batches
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def sweep(self, now: datetime | None = None) -> int:
+        now = now or datetime.now(timezone.utc)
+        start = time.perf_counter()
+        purged = 0
+        try:
+            for _ in range(self.max_batches):
+                if self._stop.is_set():
+                    break
+                # One short transaction per batch keeps row locks brief.
+                with (self.engine or get_engine()).begin() as connection:
+                    deleted = sweep_batch(
+                        connection, now, self.batch_size, self.batch_timeout
+                    )
+                purged += deleted
+                OTP_ROWS_PURGED.inc(deleted)
+                if deleted < self.batch_size:
+                    break
+        except SQLAlchemyError:
+            OTP_SWEEP_FAILURES.inc()
+            logger.warning("OTP sweep failed", exc_info=True)
+        OTP_SWEEP_SECONDS.observe(time.perf_counter() - start)
+        return purged
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="otp-sweeper", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.batch_timeout + 2)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sweep()
+
+
+otp_sweeper = OTPSweeper(
+    # None resolves the application engine when the first sweep runs.
+    engine=None,
+    interval=setting.otp_sweep_interval,
+    batch_size=setting.otp_sweep_batch_size,
+    batch_timeout=setting.otp_sweep_batch_timeout,
+    max_batches=setting.otp_sweep_max_batches,
+)
@@ -0,0 +1,127 @@
+import logging
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from app.config.config import setting
+from app.database.redis import get_redis
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger("api")
+
+
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    token_version: int
+    is_active: bool
+
+
+# Holds only what get_current_user needs to accept a token. Entries live for
+# at most PRINCIPAL_CACHE_TTL seconds, which bounds how long a revoked token
+# can still be accepted if an invalidation message is lost.
+principal_cache = TTLCache(
+    name="principal",
+    maxsize=setting.principal_cache_max_entries,
+    ttl=setting.principal_cache_ttl,
+)
+
+_publisher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="principal-publish")
+
+# Other per-user caches share the invalidation channel. Their messages are
+# prefixed with "<name>:"; unprefixed messages name principals. Each entry
+# holds the callables dropping some users and clearing the whole cache.
+_other_caches: dict[str, tuple[Callable[[list[int]], None], Callable[[], None]]] = {}
+
+
+def register_invalidation(
+    name: str, drop: Callable[[list[int]], None], clear: Callable[[], None]
+) -> None:
+    _other_caches[name] = (drop, clear)
+
+
+def _publish(message: str) -> None:
+    from redis.exceptions import RedisError
+
+    try:
+        get_redis().publish(setting.principal_invalidation_channel, message)
+    except RedisError:
+        logger.warning("Could not publish cache invalidation", exc_info=True)
+
+
+def publish_invalidation(user_ids: tuple[int, ...], name: str = "") -> None:
+    if setting.principal_invalidation_pubsub and user_ids:
+        # Publishing happens off the request path; the local entries are
+        # already gone and the TTL covers a lost message.
+        message = ",".join(str(user_id) for user_id in user_ids)
+        _publisher.submit(_publish, f"{name}:{message}" if name else message)
+
+
+def invalidate_principal(*user_ids: int) -> None:
+    for user_id in user_ids:
+        principal_cache.pop(user_id)
+    publish_invalidation(user_ids)
+
+
+class PrincipalInvalidationListener:
+    """Drops cache entries invalidated by other workers via Redis pub/sub."""
+
+    def __init__(self, channel: str, retry_interval: float = 1.0):
+        self.channel = channel
+        self.retry_interval = retry_interval
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="principal-invalidation", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+
+    def _run(self) -> None:
+        from redis.exceptions import RedisError
+
+        while not self._stop.is_set():
+            try:
+                pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                # A reconnect may have missed messages, so start clean.
+                principal_cache.clear()
+                for _, clear in _other_caches.values():
+                    clear()
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message:
+                        self.handle(message["data"])
+                pubsub.close()
+            except RedisError:
+                logger.warning(
+                    "Principal invalidation listener disconnected", exc_info=True
+                )
+                self._stop.wait(self.retry_interval)
+
+    @staticmethod
+    def handle(data: bytes | str) -> None:
+        if isinstance(data, bytes):
+            data = data.decode()
+        name, _, data = data.rpartition(":")
+        user_ids = [int(user_id) for user_id in data.split(",") if user_id.isdigit()]
+        if not name:
+            for user_id in user_ids:
+                principal_cache.pop(user_id)
+        elif name in _other_caches:
+            _other_caches[name][0](user_ids)
+
+
+principal_listener = PrincipalInvalidationListener(
+    channel=setting.principal_invalidation_channel
+)
@@ -0,0 +1,187 @@
+"""Peak RSS of the users export against row count.
+
+Seeds ``--rows`` users into the configured database, then for every row count
+runs a fresh interpreter that either streams ``GET /users/export`` through the
+ASGI app or loads the whole table the way ``GET /users/all`` used to, and
+reports the child's peak resident set size and time to first byte.
+
+    python -m benchmarks.export_memory --rows 1000 10000 100000
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+import time
+
+from sqlalchemy import delete, insert
+
+SEED_EMAIL_DOMAIN = "export-bench.invalid"
+
+
+def peak_rss_mb() -> float:
+    # VmHWM is reset by exec(), whereas ru_maxrss carries over the parent's
+    # peak into the child on Linux. Both are reported in kilobytes.
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def seed(total: int) -> None:
+    from app.database.db import get_engine
+    from app.database.models import UserModel
+    from app.utils.hashing import hash_password
+
+    hashed = hash_password("password123")
+    with get_engine().begin() as conn:
+        conn.execute(
+            delete(UserModel).where(UserModel.email.like(f"%@{SEED_EMAIL_DOMAIN}"))
+        )
+        batch = []
+        for i in range(total):
+            batch.append(
+                {
+                    "first_name": "Bench",
+                    "last_name": f"User{i}",
+                    "email": f"user{i}@{SEED_EMAIL_DOMAIN}",
+                    "hashed_password": hashed,
+                    "token_version": 0,
+                }
+            )
+            if len(batch) == 5000:
+                conn.execute(insert(UserModel), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(UserModel), batch)
+
+
+def cleanup() -> None:
+    from app.database.db import get_engine
+    from app.database.models import UserModel
+
+    with get_engine().begin() as conn:
+        conn.execute(
+            delete(UserModel).where(UserModel.email.like(f"%@{SEED_EMAIL_DOMAIN}"))
+        )
+
+
+def run_stream(fmt: str) -> dict:
+    from app.utils.login_util import get_current_user
+    from main import app
+
+    app.dependency_overrides[get_current_user] = lambda: None
+    stats = {"bytes": 0, "first_byte": None}
+    start = time.perf_counter()
+
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if requested:
+            # Never disconnect; the server side stops listening once it is done.
+            await asyncio.Event().wait()
+        requested = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            if stats["first_byte"] is None:
+                stats["first_byte"] = time.perf_counter() - start
+            stats["bytes"] += len(message["body"])
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/users/export",
+        "raw_path": b"/users/export",
+        "query_string": f"format={fmt}".encode(),
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+    asyncio.run(app(scope, receive, send))
+    stats["total"] = time.perf_counter() - start
+    return stats
+
+
+def run_list() -> dict:
+    from app.database.db import get_sessionmaker
+    from app.database.models import UserModel
+    from app.schemas.response import ResponseUserSchema, UsersSchema
+
+    start = time.perf_counter()
+    with get_sessionmaker()() as db:
+        users = db.query(UserModel).all()
+        body = UsersSchema(
+            users=[ResponseUserSchema.model_validate(u) for u in users]
+        ).model_dump_json()
+    elapsed = time.perf_counter() - start
+    return {"bytes": len(body), "first_byte": elapsed, "total": elapsed}
+
+
+def child(mode: str, fmt: str) -> None:
+    import main  # noqa: F401  (import cost is part of the baseline)
+
+    baseline = peak_rss_mb()
+    stats = run_stream(fmt) if mode == "stream" else run_list()
+    stats.update(baseline_rss_mb=baseline, peak_rss_mb=peak_rss_mb())
+    print(json.dumps(stats))
+
+
+def measure(mode: str, fmt: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.export_memory", "--child", mode, "--format", fmt],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--modes", nargs="+", default=["stream", "list"])
+    parser.add_argument("--json", action="store_true", help="print raw JSON results")
+    parser.add_argument("--child", choices=["stream", "list"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.format)
+        return
+
+    results = []
+    try:
+        for rows in sorted(args.rows):
+            seed(rows)
+            for mode in args.modes:
+                stats = measure(mode, args.format)
+                results.append({"rows": rows, "mode": mode, **stats})
+    finally:
+        cleanup()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'rows':>9} {'mode':>7} {'peak MB':>9} {'delta MB':>9} {'ttfb s':>8} {'total s':>8}")
+    for r in results:
+        print(
+            f"{r['rows']:>9} {r['mode']:>7} {r['peak_rss_mb']:>9.1f} "
+            f"{r['peak_rss_mb'] - r['baseline_rss_mb']:>9.1f} "
+            f"{r['first_byte']:>8.3f} {r['total']:>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Per-request cost of verify_access_token with and without the token cache.
+
+Rotates through ``--tokens`` distinct bearer tokens, as if that many clients
+were polling, and reports the mean time per verification.
+
+    python -m benchmarks.jwt_cache --iterations 50000 --tokens 100
+"""
+
+import argparse
+import json
+import time
+
+from fastapi import HTTPException
+
+from app.utils import login_util
+from app.utils.cache import TTLCache
+
+
+def run(tokens: list[str], iterations: int) -> float:
+    error = HTTPException(status_code=401)
+    verify = login_util.verify_access_token
+    start = time.perf_counter()
+    for i in range(iterations):
+        verify(tokens[i % len(tokens)], error)
+    return (time.perf_counter() - start) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50_000)
+    parser.add_argument("--tokens", type=int, default=100)
+    parser.add_argument("--json", action="store_true", help="print raw JSON results")
+    args = parser.parse_args()
+
+    tokens = [
+        login_util.create_access_token(token_version=0, data={"user_id": i + 1})[
+            "access_token"
+        ]
+        for i in range(args.tokens)
+    ]
+
+    cache = login_util.token_cache
+    login_util.token_cache = TTLCache(name="jwt_bench_disabled", maxsize=0, ttl=0)
+    try:
+        uncached = run(tokens, args.iterations)
+    finally:
+        login_util.token_cache = cache
+    cache.clear()
+    run(tokens, len(tokens))
+    cached = run(tokens, args.iterations)
+
+    results = {
+        "iterations": args.iterations,
+        "tokens": args.tokens,
+        "uncached_us": uncached * 1e6,
+        "cached_us": cached * 1e6,
+        "speedup": uncached / cached,
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"jwt.decode every request: {results['uncached_us']:8.2f} us/request")
+    print(f"verified-token cache:     {results['cached_us']:8.2f} us/request")
+    print(f"speedup:                  {results['speedup']:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
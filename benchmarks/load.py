@@ -0,0 +1,320 @@
+"""HTTP load test with per-route throughput and latency percentiles.
+
+Seeds users through ``tests.factories.UserFactory`` into the configured
+database, then runs ``--concurrency`` async clients for ``--duration``
+seconds. Each request picks a scenario at random according to the weights in
+``--mix``. Requests go in process through ``httpx.ASGITransport`` by default.
+With ``--url`` they go to a running server instead, for example a local
+``uvicorn main:app --workers 4`` started with the same env file and a high
+``RATE_LIMIT``. The report gives throughput and p50/p95/p99 latency per
+route. ``--output`` saves it as JSON. ``--compare`` checks it against a saved
+report and exits with status 1 when a route got slower than ``--threshold``
+allows.
+
+    python -m benchmarks.load --duration 20 --output before.json
+    python -m benchmarks.load --duration 20 --compare before.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import random
+import sys
+import time
+from collections import Counter
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+
+import httpx
+from sqlalchemy import delete
+
+# Request schemas validate emails, which rules out special-use TLDs.
+SEED_EMAIL_DOMAIN = "load-test.example.com"
+PASSWORD = "password123"
+DEFAULT_MIX = "get_user=50,list_users=25,otp_request=15,login=10"
+
+
+@dataclass
+class Seed:
+    user_ids: list[int]
+    emails: list[str]
+    otp_emails: list[str]
+    tokens: list[str]
+
+
+@dataclass
+class RouteStats:
+    latencies: list[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    errors: int = 0
+
+
+def seed(users: int, otp_users: int) -> Seed:
+    import factory
+    from sqlalchemy.orm import Session
+
+    from app.database.db import get_engine
+    from app.utils.hashing import hash_password
+    from app.utils.login_util import create_access_token
+    from tests.factories import UserFactory
+
+    hashed = hash_password(PASSWORD)
+    with Session(get_engine()) as session:
+        cleanup(session)
+        UserFactory._meta.sqlalchemy_session = session
+        verified = UserFactory.create_batch(
+            users,
+            email=factory.Sequence(lambda n: f"user{n}@{SEED_EMAIL_DOMAIN}"),
+            hashed_password=hashed,
+            is_email_verified=True,
+        )
+        # Unverified users receive email verification codes, one each.
+        unverified = UserFactory.create_batch(
+            otp_users,
+            email=factory.Sequence(lambda n: f"otp{n}@{SEED_EMAIL_DOMAIN}"),
+            hashed_password=hashed,
+        )
+        session.commit()
+        return Seed(
+            user_ids=[user.id for user in verified],
+            emails=[user.email for user in verified],
+            otp_emails=[user.email for user in unverified],
+            tokens=[
+                create_access_token(token_version=0, data={"user_id": user.id})[
+                    "access_token"
+                ]
+                for user in verified
+            ],
+        )
+
+
+def cleanup(session=None) -> None:
+    from sqlalchemy.orm import Session
+
+    from app.database.db import get_engine
+    from app.database.models import OTPModel, UserModel
+
+    with session or Session(get_engine()) as db:
+        pattern = f"%@{SEED_EMAIL_DOMAIN}"
+        db.execute(delete(OTPModel).where(OTPModel.email.like(pattern)))
+        db.execute(delete(UserModel).where(UserModel.email.like(pattern)))
+        db.commit()
+
+
+class Scenarios:
+    """One method per scenario, each returning (route, response)."""
+
+    def __init__(self, data: Seed, rng: random.Random, otp_emails: Iterator[str]):
+        self.data = data
+        self.rng = rng
+        self.otp_emails = otp_emails
+
+    def _auth(self) -> dict:
+        return {"Authorization": f"Bearer {self.rng.choice(self.data.tokens)}"}
+
+    async def login(self, client):
+        form = {"username": self.rng.choice(self.data.emails), "password": PASSWORD}
+        return "POST /login/", await client.post("/login/", data=form)
+
+    async def get_user(self, client):
+        user_id = self.rng.choice(self.data.user_ids)
+        res = await client.get(f"/users/{user_id}", headers=self._auth())
+        return "GET /users/{id}", res
+
+    async def list_users(self, client):
+        return "GET /users/all", await client.get("/users/all", headers=self._auth())
+
+    async def otp_request(self, client):
+        payload = {"email": next(self.otp_emails), "purpose": "email_verification"}
+        res = await client.post("/users/otp/request", json=payload)
+        return "POST /users/otp/request", res
+
+
+# Statuses that are a normal outcome of the scenario rather than a failure;
+# an email that already has a live code is answered with 409.
+EXPECTED_STATUSES = {"POST /users/otp/request": {200, 409}}
+
+
+def parse_mix(mix: str) -> dict[str, int]:
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        if not hasattr(Scenarios, name.strip()):
+            raise SystemExit(f"unknown scenario {name!r}")
+        weights[name.strip()] = int(weight or 1)
+    return weights
+
+
+def percentile(values: list[float], q: float) -> float:
+    # Nearest-rank percentile of already sorted values.
+    if not values:
+        return 0.0
+    rank = max(0, math.ceil(q / 100 * len(values)) - 1)
+    return values[rank]
+
+
+def summarize(stats: dict[str, RouteStats], elapsed: float) -> dict:
+    routes = {}
+    for route, route_stats in sorted(stats.items()):
+        latencies = sorted(route_stats.latencies)
+        routes[route] = {
+            "requests": len(latencies),
+            "errors": route_stats.errors,
+            "rps": len(latencies) / elapsed,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+            "statuses": {str(k): v for k, v in sorted(route_stats.statuses.items())},
+        }
+    total = sum(route["requests"] for route in routes.values())
+    return {"elapsed_s": elapsed, "rps": total / elapsed, "routes": routes}
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Describe every route that got slower or lost throughput."""
+    regressions = []
+    for route, before in baseline["routes"].items():
+        after = current["routes"].get(route)
+        if after is None:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            if after[metric] > before[metric] * (1 + threshold):
+                regressions.append(
+                    f"{route} {metric} {before[metric]:.1f} -> {after[metric]:.1f}"
+                )
+        if after["rps"] < before["rps"] * (1 - threshold):
+            regressions.append(f"{route} rps {before['rps']:.1f} -> {after['rps']:.1f}")
+    return regressions
+
+
+async def run(
+    client: httpx.AsyncClient,
+    data: Seed,
+    weights: dict[str, int],
+    concurrency: int,
+    duration: float,
+    warmup: float,
+    rng_seed: int,
+) -> dict:
+    stats: dict[str, RouteStats] = {}
+    names, cum_weights = list(weights), list(itertools.accumulate(weights.values()))
+    # Shared so each email gets a code once before any repeats.
+    otp_emails = itertools.cycle(data.otp_emails)
+    start = time.perf_counter()
+    measure_from = start + warmup
+    stop_at = measure_from + duration
+
+    async def worker(index: int) -> None:
+        rng = random.Random(rng_seed + index)
+        scenarios = Scenarios(data, rng, otp_emails)
+        while (now := time.perf_counter()) < stop_at:
+            name = rng.choices(names, cum_weights=cum_weights)[0]
+            route, res = await getattr(scenarios, name)(client)
+            if now < measure_from:
+                continue
+            route_stats = stats.setdefault(route, RouteStats())
+            route_stats.latencies.append(time.perf_counter() - now)
+            route_stats.statuses[res.status_code] += 1
+            expected = EXPECTED_STATUSES.get(route, {200})
+            if res.status_code not in expected:
+                route_stats.errors += 1
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return summarize(stats, time.perf_counter() - measure_from)
+
+
+def client_for(url: str | None, concurrency: int) -> httpx.AsyncClient:
+    limits = httpx.Limits(max_connections=concurrency)
+    if url:
+        return httpx.AsyncClient(base_url=url, limits=limits, timeout=30)
+
+    from app.middleware.middleware import RequestMiddleware
+    from app.middleware.rate_limit import SlidingWindowRateLimiter
+    from main import app
+
+    # Every in-process request comes from the same client address. The
+    # middleware stack is built on the first request, so this still applies.
+    for entry in app.user_middleware:
+        if entry.cls is RequestMiddleware:
+            entry.kwargs["rate_limiter"] = SlidingWindowRateLimiter(
+                limit=10**12, window=60, max_clients=10
+            )
+    transport = httpx.ASGITransport(app=app)
+    return httpx.AsyncClient(transport=transport, base_url="http://load", timeout=30)
+
+
+def print_report(report: dict) -> None:
+    print(
+        f"{'route':<26} {'reqs':>7} {'err':>5} {'rps':>8} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    )
+    for route, r in report["routes"].items():
+        print(
+            f"{route:<26} {r['requests']:>7} {r['errors']:>5} {r['rps']:>8.1f} "
+            f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f}"
+        )
+    print(f"{'total':<26} {'':>7} {'':>5} {report['rps']:>8.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="base URL of a running server")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--otp-users", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--output", help="save the JSON report to this file")
+    parser.add_argument("--compare", help="JSON report of a previous run")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--json", action="store_true", help="print raw JSON results")
+    args = parser.parse_args()
+
+    weights = parse_mix(args.mix)
+    data = seed(args.users, args.otp_users)
+
+    async def go() -> dict:
+        async with client_for(args.url, args.concurrency) as client:
+            return await run(
+                client,
+                data,
+                weights,
+                args.concurrency,
+                args.duration,
+                args.warmup,
+                args.seed,
+            )
+
+    try:
+        report = asyncio.run(go())
+    finally:
+        cleanup()
+    report.update(
+        target=args.url or "asgi",
+        concurrency=args.concurrency,
+        mix=weights,
+    )
+
+    if args.output:
+        with open(args.output, "w") as out:
+            json.dump(report, out, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+    if args.compare:
+        with open(args.compare) as baseline:
+            regressions = compare(report, json.load(baseline), args.threshold)
+        for regression in regressions:
+            print(f"regression: {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""Micro-benchmarks of the per-request hot functions, no database needed.
+
+Times JWT creation and verification, password hashing and verification, the
+rate limiter check that runs in front of every request, and user
+serialization, each at several input sizes. ``--output`` saves the results
+as JSON. ``--compare`` reports the percentage change per case against a saved
+run. It compares against this run, or against a second saved file when one
+is given, in which case nothing is timed.
+
+    python -m benchmarks.micro --output before.json
+    python -m benchmarks.micro --compare before.json
+    python -m benchmarks.micro --compare before.json after.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import time
+import timeit
+from collections.abc import Callable, Iterator
+
+# (case name, size label, factory building the function to time)
+Case = tuple[str, str, Callable[[], Callable[[], object]]]
+
+
+def jwt_cases() -> Iterator[Case]:
+    from fastapi import HTTPException
+
+    from app.utils import login_util
+    from app.utils.cache import TTLCache
+
+    error = HTTPException(status_code=401)
+
+    def create():
+        return lambda: login_util.create_access_token(
+            token_version=0, data={"user_id": 1}
+        )
+
+    yield "create_access_token", "-", create
+
+    def verify(tokens: int, cached: bool):
+        def build():
+            batch = [
+                login_util.create_access_token(token_version=0, data={"user_id": i})[
+                    "access_token"
+                ]
+                for i in range(1, tokens + 1)
+            ]
+            login_util.token_cache = (
+                TTLCache(name="micro_tokens", maxsize=tokens, ttl=900)
+                if cached
+                else TTLCache(name="micro_tokens_off", maxsize=0, ttl=0)
+            )
+            it = iter(range(1 << 62))
+            verify = login_util.verify_access_token
+            return lambda: verify(batch[next(it) % tokens], error)
+
+        return build
+
+    for tokens in (1, 100, 10_000):
+        yield "verify_access_token", f"tokens={tokens},uncached", verify(tokens, False)
+        yield "verify_access_token", f"tokens={tokens},cached", verify(tokens, True)
+
+
+def password_cases() -> Iterator[Case]:
+    from app.utils.hashing import hash_password, verify_password
+
+    yield "hash_password", "-", lambda: lambda: hash_password("password123")
+
+    def verify():
+        hashed = hash_password("password123")
+        return lambda: verify_password("password123", hashed)
+
+    yield "verify_password", "-", verify
+
+
+def rate_limit_cases() -> Iterator[Case]:
+    from app.middleware.rate_limit import SlidingWindowRateLimiter
+
+    # The sliding-window counter keeps two counts per client instead of a
+    # request history, so the size that matters is the client table.
+    def known_clients(clients: int):
+        def build():
+            limiter = SlidingWindowRateLimiter(
+                limit=10**12, window=60, max_clients=clients
+            )
+            keys = [f"10.0.{i // 256}.{i % 256}" for i in range(clients)]
+            for key in keys:
+                limiter.allow(key)
+            it = iter(range(1 << 62))
+            return lambda: limiter.allow(keys[next(it) % clients])
+
+        return build
+
+    def new_clients(clients: int):
+        def build():
+            limiter = SlidingWindowRateLimiter(
+                limit=10**12, window=60, max_clients=clients
+            )
+            it = iter(range(1 << 62))
+            return lambda: limiter.allow(str(next(it)))
+
+        return build
+
+    for clients in (1, 1_000, 100_000):
+        yield "rate_limit.allow", f"clients={clients},known", known_clients(clients)
+    yield "rate_limit.allow", "clients=100000,new", new_clients(100_000)
+
+
+def serialization_cases() -> Iterator[Case]:
+    from app.database.models import UserModel
+    from app.schemas.response import ResponseUserSchema, UsersSchema
+
+    def users(count: int) -> list[UserModel]:
+        return [
+            UserModel(
+                id=i,
+                first_name="Bench",
+                last_name=f"User{i}",
+                email=f"user{i}@bench.example.com",
+            )
+            for i in range(count)
+        ]
+
+    def validate(count: int):
+        def build():
+            rows = users(count)
+            return lambda: [ResponseUserSchema.model_validate(row) for row in rows]
+
+        return build
+
+    def response(count: int):
+        def build():
+            rows = users(count)
+            return lambda: UsersSchema(
+                users=[ResponseUserSchema.model_validate(row) for row in rows]
+            ).model_dump_json()
+
+        return build
+
+    for count in (1, 100, 1_000):
+        yield "ResponseUserSchema.model_validate", f"users={count}", validate(count)
+        yield "UsersSchema.model_dump_json", f"users={count}", response(count)
+
+
+GROUPS = (jwt_cases, password_cases, rate_limit_cases, serialization_cases)
+
+
+def time_case(fn: Callable[[], object], repeat: int) -> dict:
+    timer = timeit.Timer(fn, timer=time.perf_counter)
+    loops, _ = timer.autorange()
+    runs = [total / loops for total in timer.repeat(repeat=repeat, number=loops)]
+    return {
+        "per_op_us": statistics.median(runs) * 1e6,
+        "best_us": min(runs) * 1e6,
+        "loops": loops,
+    }
+
+
+def run(repeat: int, selected: str | None) -> dict:
+    from app.utils import login_util
+
+    cases = {}
+    for group in GROUPS:
+        for name, size, build in group():
+            key = f"{name}[{size}]"
+            if selected and selected not in key:
+                continue
+            # The verify cases swap in their own token cache; put the
+            # app's back before the next case is built.
+            token_cache = login_util.token_cache
+            try:
+                cases[key] = time_case(build(), repeat)
+            finally:
+                login_util.token_cache = token_cache
+    return {"python": platform.python_version(), "cases": cases}
+
+
+def compare(before: dict, after: dict) -> list[tuple[str, float, float, float]]:
+    rows = []
+    for key, old in before["cases"].items():
+        new = after["cases"].get(key)
+        if new is None:
+            continue
+        change = (new["per_op_us"] - old["per_op_us"]) / old["per_op_us"] * 100
+        rows.append((key, old["per_op_us"], new["per_op_us"], change))
+    return rows
+
+
+def print_results(results: dict) -> None:
+    print(f"{'case':<62} {'us/op':>12} {'best':>12}")
+    for key, case in results["cases"].items():
+        print(f"{key:<62} {case['per_op_us']:>12.2f} {case['best_us']:>12.2f}")
+
+
+def print_comparison(rows: list[tuple[str, float, float, float]]) -> None:
+    print(f"{'case':<62} {'before':>12} {'after':>12} {'change':>8}")
+    for key, old, new, change in rows:
+        print(f"{key:<62} {old:>12.2f} {new:>12.2f} {change:>+7.1f}%")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--filter", help="only run cases whose name contains this")
+    parser.add_argument("--output", help="save the results to this JSON file")
+    parser.add_argument(
+        "--compare",
+        nargs="+",
+        metavar="RESULTS",
+        help="saved run to compare with, optionally followed by a second one",
+    )
+    parser.add_argument("--json", action="store_true", help="print raw JSON results")
+    args = parser.parse_args()
+
+    if args.compare and len(args.compare) > 2:
+        parser.error("--compare takes one or two files")
+    if args.compare and len(args.compare) == 2:
+        with open(args.compare[0]) as before, open(args.compare[1]) as after:
+            print_comparison(compare(json.load(before), json.load(after)))
+        return
+
+    results = run(args.repeat, args.filter)
+    if args.output:
+        with open(args.output, "w") as out:
+            json.dump(results, out, indent=2)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    elif not args.compare:
+        print_results(results)
+    if args.compare:
+        with open(args.compare[0]) as before:
+            print_comparison(compare(json.load(before), results))
+
+
+if __name__ == "__main__":
+    main()
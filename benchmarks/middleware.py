@@ -0,0 +1,128 @@
+"""Requests per second on ``GET /`` through the request middleware.
+
+Serves the same ``GET /`` route behind ``RequestMiddleware`` and behind the
+function-based ``BaseHTTPMiddleware`` handler it replaced, drives each app in
+process through ``httpx.ASGITransport`` with ``--concurrency`` clients, and
+reports requests per second. The rate limit is lifted and access logging is
+silenced so only the middleware plumbing is measured.
+
+    python -m benchmarks.middleware --requests 20000 --concurrency 10
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+
+import httpx
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+from app.database.query_stats import observe_query_stats, track_queries
+from app.middleware.middleware import RequestMiddleware
+from app.middleware.rate_limit import SlidingWindowRateLimiter
+
+logger = logging.getLogger("api")
+
+# Every in-process request comes from the same client address.
+rate_limiter = SlidingWindowRateLimiter(limit=10**12, window=60, max_clients=10)
+
+
+async def legacy_handler(request: Request, call_next):
+    # The handler as it was registered with app.middleware("http").
+    start_time = time.perf_counter()
+    try:
+        client_ip = request.client.host if request.client else "unknown"
+        path = request.url.path
+        method = request.method
+        if not await rate_limiter.hit(client_ip):
+            return JSONResponse(
+                status_code=429, content={"detail": "Too many requests"}
+            )
+        with track_queries() as query_stats:
+            response = await call_next(request)
+        process_time = time.perf_counter() - start_time
+        response.headers["X-Process-Time"] = f"{process_time:.4f}s"
+        response.headers["X-DB-Statements"] = str(query_stats.statements)
+        response.headers["X-DB-Time"] = f"{query_stats.seconds:.4f}s"
+        route = request.scope.get("route")
+        if route is not None:
+            observe_query_stats(query_stats, method, route.path)
+        logger.info(
+            f"{client_ip} | {method} {path} | "
+            f"{response.status_code} | {process_time:.4f}s"
+        )
+        return response
+    except HTTPException as exc:
+        logger.warning(
+            f"HTTPException | {request.method} {request.url.path} | {exc.detail}"
+        )
+        raise exc
+    except Exception:
+        logger.exception(f"Unhandled error | {request.method} {request.url.path}")
+        return JSONResponse(
+            status_code=500,
+            content={"message": "Something went wrong"},
+        )
+
+
+def build_app(legacy: bool) -> FastAPI:
+    app = FastAPI()
+    if legacy:
+        app.middleware("http")(legacy_handler)
+    else:
+        app.add_middleware(RequestMiddleware, rate_limiter=rate_limiter)
+
+    @app.get("/")
+    def read_root():
+        return {"Hello": "World"}
+
+    return app
+
+
+async def run(app: FastAPI, requests: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+
+        async def worker(count: int) -> None:
+            for _ in range(count):
+                res = await c.get("/")
+                res.raise_for_status()
+
+        await worker(min(requests, 100))
+        per_worker = requests // concurrency
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(per_worker) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return per_worker * concurrency / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--json", action="store_true", help="print raw JSON results")
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+    legacy = asyncio.run(run(build_app(True), args.requests, args.concurrency))
+    asgi = asyncio.run(run(build_app(False), args.requests, args.concurrency))
+
+    results = {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "base_http_middleware_rps": legacy,
+        "asgi_middleware_rps": asgi,
+        "speedup": asgi / legacy,
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"BaseHTTPMiddleware: {results['base_http_middleware_rps']:10.0f} req/s")
+    print(f"ASGI middleware:    {results['asgi_middleware_rps']:10.0f} req/s")
+    print(f"speedup:            {results['speedup']:10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
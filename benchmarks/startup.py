@@ -0,0 +1,93 @@
+"""Cold start: time from ``python -c 'import main'`` to the first served request.
+
+Every run starts a fresh interpreter that imports ``main`` and serves it with
+uvicorn on a free port, while this process polls ``GET /`` until it answers.
+Reports the child's import time and the wall time from spawning the child to
+the first 200 response.
+
+    python -m benchmarks.startup --runs 5
+"""
+
+import argparse
+import json
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+CHILD = """
+import time
+start = time.perf_counter()
+import main
+print(time.perf_counter() - start, flush=True)
+import uvicorn
+uvicorn.run(main.app, port={port}, log_level="warning")
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure(timeout: float = 30.0) -> dict:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/"
+    start = time.perf_counter()
+    child = subprocess.Popen(
+        [sys.executable, "-c", CHILD.format(port=port)],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    try:
+        while True:
+            if child.poll() is not None:
+                raise RuntimeError(f"server exited with status {child.returncode}")
+            if time.perf_counter() - start > timeout:
+                raise TimeoutError(f"no response from {url} after {timeout}s")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as res:
+                    if res.status == 200:
+                        break
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.005)
+        first_request = time.perf_counter() - start
+        import_seconds = float(child.stdout.readline())
+    finally:
+        child.terminate()
+        child.wait(timeout=10)
+    return {"import_seconds": import_seconds, "first_request_seconds": first_request}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print raw JSON results")
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(args.runs)]
+    results = {
+        "runs": args.runs,
+        "import_seconds": statistics.median(r["import_seconds"] for r in runs),
+        "first_request_seconds": statistics.median(
+            r["first_request_seconds"] for r in runs
+        ),
+        "first_request_min_seconds": min(r["first_request_seconds"] for r in runs),
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"import main:          {results['import_seconds'] * 1000:8.0f} ms (median)")
+    print(
+        f"first served request: {results['first_request_seconds'] * 1000:8.0f} ms "
+        f"(median, min {results['first_request_min_seconds'] * 1000:.0f} ms)"
+    )
+
+
+if __name__ == "__main__":
+    main()
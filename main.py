@@ -3,23 +3,56 @@
 # actual finished:- 4:38
 # testing started: - 4:55
 # pushed on : 8:30
-import uvicorn
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from app.middleware.middleware import middleware_handler
-from app.routes import users, login
+from app.config.config import setting
+from app.core.enums import OTPStoreBackend
+from app.middleware.access_log import access_log
+from app.middleware.middleware import RequestMiddleware
+from app.utils.metrics import cleanup_dead_workers, mark_worker_exited
+from app.utils.otp_sweeper import otp_sweeper
+from app.utils.principal_cache import principal_listener
 from prometheus_fastapi_instrumentator import Instrumentator
 
 # from app.middleware.rate_limit import RateLimitMiddleware
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    cleanup_dead_workers()
+    access_log.start()
+    if setting.principal_invalidation_pubsub:
+        principal_listener.start()
+    sweep_otps = (
+        setting.otp_store_backend == OTPStoreBackend.DATABASE
+        and setting.otp_sweep_interval > 0
+    )
+    if sweep_otps:
+        otp_sweeper.start()
+    yield
+    principal_listener.stop()
+    otp_sweeper.stop()
+    access_log.stop()
+    mark_worker_exited()
+
+
+app = FastAPI(lifespan=lifespan)
 
 Instrumentator().instrument(app).expose(app)
 
 # Base.metadata.create_all(bind=engine)
-app.include_router(login.router)
-app.include_router(users.router)
-app.middleware("http")(middleware_handler)
+# Only the router set in use is imported, along with its database driver.
+if setting.database_async:
+    from app.routes import async_login, async_users
+
+    app.include_router(async_login.router)
+    app.include_router(async_users.router)
+else:
+    from app.routes import login, users
+
+    app.include_router(login.router)
+    app.include_router(users.router)
+app.add_middleware(RequestMiddleware)
 
 # app.add_middleware(RateLimitMiddleware)
 
@@ -30,6 +63,8 @@ def read_root():
 
 
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run(app)
 # alembic revision --autogenerate -m "baseline"
 # alembic upgrade head
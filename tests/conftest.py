@@ -1,17 +1,24 @@
+import httpx
 import pytest
-from sqlalchemy import create_engine
+from fastapi import FastAPI
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import NullPool
 from fastapi.testclient import TestClient
 
 from app.database.models import Base
-from app.database.db import get_db
+from app.database.db import get_async_db, get_db
+from app.routes import async_login, async_users
 from main import app
 from app.config.config import setting
 from tests.factories import UserFactory
-from app.middleware.middleware import rate_limit_store
+from app.middleware.middleware import rate_limit_store, response_cache
+from app.utils.login_util import token_cache
+from app.utils.principal_cache import principal_cache
 
 TEST_DATABASE_URL = f"postgresql://{setting.database_username}:{setting.database_password}@{setting.database_hostname}:{setting.database_port}/{setting.database_name}_test"
+TEST_ASYNC_DATABASE_URL = f"postgresql+asyncpg://{setting.database_username}:{setting.database_password}@{setting.database_hostname}:{setting.database_port}/{setting.database_name}_test"
 
 
 @pytest.fixture(scope="session")
@@ -41,6 +48,19 @@ def db_session(engine):
     connection.close()
 
 
+@pytest.fixture
+def statements(engine):
+    # Every statement sent through the test engine, in order.
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
 @pytest.fixture(scope="function")
 def client(db_session):
     def override_get_db():
@@ -55,6 +75,44 @@ def client(db_session):
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def async_db_session(engine):
+    async_engine = create_async_engine(TEST_ASYNC_DATABASE_URL, poolclass=NullPool)
+    async with async_engine.connect() as connection:
+        transaction = await connection.begin()
+        session = AsyncSession(
+            bind=connection,
+            autoflush=False,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        )
+        yield session
+        await session.close()
+        await transaction.rollback()
+    await async_engine.dispose()
+
+
+@pytest.fixture
+async def async_client(async_db_session):
+    async def override_get_async_db():
+        yield async_db_session
+
+    async_app = FastAPI()
+    async_app.include_router(async_login.router)
+    async_app.include_router(async_users.router)
+    async_app.dependency_overrides[get_async_db] = override_get_async_db
+    transport = httpx.ASGITransport(app=async_app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://test", follow_redirects=True
+    ) as test_client:
+        yield test_client
+
+
 @pytest.fixture(autouse=True)
 def bind_factory_session(db_session):
     UserFactory._meta.sqlalchemy_session = db_session
@@ -63,3 +121,10 @@ def bind_factory_session(db_session):
 @pytest.fixture(autouse=True)
 def clear_rate_limit():
     rate_limit_store.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    response_cache.clear()
+    principal_cache.clear()
+    token_cache.clear()
@@ -3,7 +3,7 @@ from faker import Faker
 from factory.alchemy import SQLAlchemyModelFactory
 
 from app.database.models import UserModel
-from app.utils.login_util import hash_password
+from app.utils.hashing import hash_password
 
 fake = Faker()
 
@@ -0,0 +1,93 @@
+import io
+import json
+import logging
+import threading
+
+from prometheus_client import REGISTRY
+
+from app.middleware.access_log import AccessLog
+
+
+def test_access_log_writes_json_lines():
+    stream = io.StringIO()
+    log = AccessLog(
+        sample_rate=1.0,
+        slow_seconds=1.0,
+        queue_size=100,
+        handler=logging.StreamHandler(stream),
+        name="test.access.json",
+    )
+    log.start()
+    log.log("1.2.3.4", "GET", "/users/1", 200, 0.0123)
+    log.stop()
+
+    entry = json.loads(stream.getvalue())
+    assert entry["client"] == "1.2.3.4"
+    assert entry["method"] == "GET"
+    assert entry["path"] == "/users/1"
+    assert entry["status"] == 200
+    assert entry["duration_ms"] == 12.3
+    assert entry["level"] == "INFO"
+
+
+def test_sampling_keeps_errors_and_slow_requests():
+    log = AccessLog(sample_rate=0.0, slow_seconds=0.5, queue_size=1)
+    assert not log.sampled(200, 0.01)
+    assert log.sampled(404, 0.01)
+    assert log.sampled(500, 0.01)
+    assert log.sampled(200, 0.75)
+    assert AccessLog(sample_rate=1.0, slow_seconds=0.5, queue_size=1).sampled(200, 0.01)
+
+
+class BlockingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.entered = threading.Event()
+        self.unblock = threading.Event()
+        self.records = 0
+
+    def emit(self, record):
+        self.entered.set()
+        self.unblock.wait(timeout=5)
+        self.records += 1
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = BlockingHandler()
+    log = AccessLog(
+        sample_rate=1.0,
+        slow_seconds=1.0,
+        queue_size=1,
+        handler=handler,
+        name="test.access.blocking",
+    )
+    dropped_before = REGISTRY.get_sample_value("access_log_dropped_total") or 0
+    log.start()
+    try:
+        log.log("1.2.3.4", "GET", "/", 200, 0.001)
+        assert handler.entered.wait(timeout=5)
+        # The writer is stuck on the first record: one more fits in the
+        # queue and the rest are dropped without waiting.
+        for _ in range(4):
+            log.log("1.2.3.4", "GET", "/", 200, 0.001)
+    finally:
+        handler.unblock.set()
+        log.stop()
+
+    assert log.dropped == 3
+    assert handler.records == 2
+    assert REGISTRY.get_sample_value("access_log_dropped_total") == dropped_before + 3
+
+
+def test_nothing_is_logged_before_start():
+    handler = BlockingHandler()
+    log = AccessLog(
+        sample_rate=1.0,
+        slow_seconds=1.0,
+        queue_size=1,
+        handler=handler,
+        name="test.access.idle",
+    )
+    log.log("1.2.3.4", "GET", "/", 500, 0.001)
+    assert log.dropped == 0
+    assert not handler.entered.is_set()
@@ -0,0 +1,135 @@
+import pytest
+from unittest.mock import patch
+
+from app.core.enums import OTPPurpose
+from app.schemas.response import ResponseUserSchema, UsersSchema
+
+pytestmark = pytest.mark.anyio
+
+
+async def authenticate_user(
+    client, email="asyncuser@example.com", password="password123"
+):
+    res = await client.post(
+        "/users/create/",
+        json={
+            "first_name": "Async",
+            "last_name": "User",
+            "email": email,
+            "password": password,
+        },
+    )
+    assert res.status_code == 201
+
+    with patch("app.services.async_user_service.generate_otp") as mock_otp:
+        mock_otp.return_value = "123456"
+
+        await client.post(
+            "/users/otp/request/",
+            json={"email": email, "purpose": OTPPurpose.EMAIL_VERIFICATION.value},
+        )
+
+    await client.post("/users/otp/verify/", json={"email": email, "otp": "123456"})
+
+    res = await client.post("/login/", data={"username": email, "password": password})
+    assert res.status_code == 200
+    token = res.json()["access_token"]
+
+    return {"Authorization": f"Bearer {token}"}, res.json()
+
+
+async def test_async_create_user_duplicate(async_client):
+    payload = {
+        "first_name": "Dup",
+        "last_name": "User",
+        "email": "dup@test.com",
+        "password": "password123",
+    }
+    res = await async_client.post("/users/create/", json=payload)
+    assert res.status_code == 201
+    res = await async_client.post("/users/create/", json=payload)
+    assert res.status_code == 409
+
+
+async def test_async_get_users(async_client):
+    headers, _ = await authenticate_user(async_client)
+    res = await async_client.get("/users/all", headers=headers)
+    assert res.status_code == 200
+    users = UsersSchema.model_validate(res.json()).users
+    assert len(users) == 1
+
+    res = await async_client.get(f"/users/{users[0].id}", headers=headers)
+    assert res.status_code == 200
+    assert ResponseUserSchema.model_validate(res.json()).email == users[0].email
+
+    res = await async_client.get("/users/999999", headers=headers)
+    assert res.status_code == 404
+
+
+async def test_async_export_users(async_client):
+    headers, _ = await authenticate_user(async_client)
+    res = await async_client.get(
+        "/users/export", params={"format": "csv"}, headers=headers
+    )
+    assert res.status_code == 200
+    lines = res.text.splitlines()
+    assert lines[0] == "id,first_name,last_name,email"
+    assert lines[1].endswith("asyncuser@example.com")
+
+
+async def test_async_users_batch(async_client):
+    headers, _ = await authenticate_user(async_client)
+    other, _ = await authenticate_user(async_client, email="other@example.com")
+    users = (await async_client.get("/users/all", headers=headers)).json()["users"]
+    ids = [user["id"] for user in users]
+
+    res = await async_client.post(
+        "/users/batch", json={"ids": ids + [999999]}, headers=headers
+    )
+    assert res.status_code == 200
+    assert [user["id"] for user in res.json()["users"]] == ids
+    assert res.json()["missing"] == [999999]
+
+    res = await async_client.post(
+        "/users/batch/deactivate", json={"ids": ids[1:]}, headers=headers
+    )
+    assert res.json()["ids"] == ids[1:]
+    res = await async_client.get(f"/users/{ids[0]}", headers=other)
+    assert res.status_code == 401
+
+    res = await async_client.post(
+        "/users/batch/delete", json={"ids": ids[1:]}, headers=headers
+    )
+    assert res.json()["ids"] == ids[1:]
+
+
+async def test_async_login_wrong_password(async_client):
+    email = "wrongpass@test.com"
+    await authenticate_user(async_client, email=email)
+    res = await async_client.post(
+        "/login/", data={"username": email, "password": "nope"}
+    )
+    assert res.status_code == 401
+
+
+async def test_async_update_password_revokes_token(async_client):
+    headers, _ = await authenticate_user(async_client)
+    res = await async_client.put(
+        "/users/update-detail",
+        json={"first_name": "New", "last_name": "Name"},
+        headers=headers,
+    )
+    assert res.status_code == 202
+    res = await async_client.patch(
+        "/users/update-password",
+        json={"old_password": "password123", "new_password": "newpassword123"},
+        headers=headers,
+    )
+    assert res.status_code == 202
+    res = await async_client.get("/users/all", headers=headers)
+    assert res.status_code == 401
+
+
+async def test_async_protected_without_token(async_client):
+    res = await async_client.get("/users/all")
+    assert res.status_code == 401
@@ -1,9 +1,14 @@
+import hashlib
 import time
 import pytest
+from datetime import timedelta
+from fastapi import HTTPException
 from unittest.mock import patch
 
 from app.schemas.token import Token
 from app.core.enums import OTPPurpose
+from app.utils import login_util
+from app.utils.login_util import create_access_token, token_cache, verify_access_token
 
 
 def create_user_via_api(client, email):
@@ -153,3 +158,32 @@ def test_login_without_verification(client):
     )
 
     assert res.status_code in (400, 401)
+
+
+def test_verified_token_is_cached():
+    token = create_access_token(token_version=3, data={"user_id": 11})["access_token"]
+    error = HTTPException(status_code=401)
+    with patch.object(login_util.jwt, "decode", wraps=login_util.jwt.decode) as decode:
+        assert verify_access_token(token, error) == (11, 3)
+        assert verify_access_token(token, error) == (11, 3)
+    assert decode.call_count == 1
+
+
+def test_token_cache_entry_expires_with_token():
+    token = create_access_token(
+        token_version=0, data={"user_id": 12}, expires_delta=timedelta(seconds=1)
+    )["access_token"]
+    error = HTTPException(status_code=401)
+    assert verify_access_token(token, error) == (12, 0)
+    digest = hashlib.sha256(token.encode()).digest()
+    assert token_cache.get(digest) == (12, 0)
+    with patch("app.utils.cache.time.monotonic", return_value=time.monotonic() + 2):
+        assert token_cache.get(digest) is None
+
+
+def test_invalid_token_is_not_cached():
+    error = HTTPException(status_code=401)
+    for _ in range(2):
+        with pytest.raises(HTTPException):
+            verify_access_token("not-a-token", error)
+    assert len(token_cache) == 0
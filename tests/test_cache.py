@@ -0,0 +1,43 @@
+from unittest.mock import patch
+
+from app.utils.cache import TTLCache
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(name="test_expiry", maxsize=10, ttl=10)
+    with patch("app.utils.cache.time.monotonic", return_value=100.0):
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+    with patch("app.utils.cache.time.monotonic", return_value=111.0):
+        assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(name="test_lru", maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_per_entry_ttl_and_disable():
+    cache = TTLCache(name="test_ttl_override", maxsize=10, ttl=60)
+    cache.set("short", 1, ttl=0)
+    assert cache.get("short") is None
+    disabled = TTLCache(name="test_disabled", maxsize=10, ttl=0)
+    disabled.set("a", 1)
+    assert len(disabled) == 0
+
+
+def test_ttl_cache_pop_where():
+    cache = TTLCache(name="test_pop_where", maxsize=10, ttl=60)
+    cache.set(("users", 1), 1)
+    cache.set(("users", 2), 2)
+    cache.set(("user", 1), 3)
+    cache.pop_where(lambda key: key[0] == "users")
+    assert len(cache) == 1
+    assert cache.pop(("user", 1)) == 3
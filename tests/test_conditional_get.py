@@ -0,0 +1,165 @@
+from datetime import timedelta
+from email.utils import format_datetime, parsedate_to_datetime
+
+import pytest
+from sqlalchemy import select
+
+from app.database.models import UserModel
+from app.middleware.middleware import response_cache
+from tests.factories import UserFactory
+from tests.test_async_users import authenticate_user as authenticate_user_async
+from tests.test_users import authenticate_user
+
+
+@pytest.fixture
+def headers(client):
+    return authenticate_user(client)
+
+
+@pytest.fixture
+def user(db_session):
+    user = UserFactory()
+    db_session.flush()
+    return user
+
+
+def test_user_etag_answers_304(client, headers, user):
+    res = client.get(f"/users/{user.id}", headers=headers)
+    assert res.status_code == 200
+    etag = res.headers["ETag"]
+    assert etag.startswith('"') and "Last-Modified" in res.headers
+
+    res = client.get(f"/users/{user.id}", headers={**headers, "If-None-Match": etag})
+    assert res.status_code == 304
+    assert res.content == b""
+    assert res.headers["ETag"] == etag
+
+    # Without the response cache only the version is looked up.
+    response_cache.clear()
+    res = client.get(
+        f"/users/{user.id}", headers={**headers, "If-None-Match": f'"x", W/{etag}'}
+    )
+    assert res.status_code == 304
+
+
+def test_version_lookup_skips_full_fetch(client, headers, user, statements):
+    etag = client.get(f"/users/{user.id}", headers=headers).headers["ETag"]
+    response_cache.clear()
+    statements.clear()
+    res = client.get(f"/users/{user.id}", headers={**headers, "If-None-Match": etag})
+    assert res.status_code == 304
+    assert len(statements) == 1
+    assert "updated_at" in statements[0] and "first_name" not in statements[0]
+
+
+def test_user_etag_changes_on_update(client, headers, db_session):
+    user_id = client.get("/users/all", headers=headers).json()["users"][0]["id"]
+    before = client.get(f"/users/{user_id}", headers=headers)
+    updated_at = db_session.scalar(
+        select(UserModel.updated_at).where(UserModel.id == user_id)
+    )
+
+    client.put(
+        "/users/update-detail",
+        json={"first_name": "New", "last_name": "User"},
+        headers=headers,
+    )
+    assert (
+        db_session.scalar(select(UserModel.updated_at).where(UserModel.id == user_id))
+        > updated_at
+    )
+    res = client.get(
+        f"/users/{user_id}",
+        headers={**headers, "If-None-Match": before.headers["ETag"]},
+    )
+    assert res.status_code == 200
+    assert res.json()["first_name"] == "New"
+    assert res.headers["ETag"] != before.headers["ETag"]
+
+
+def test_if_modified_since(client, headers, user):
+    res = client.get(f"/users/{user.id}", headers=headers)
+    last_modified = res.headers["Last-Modified"]
+    earlier = format_datetime(
+        parsedate_to_datetime(last_modified) - timedelta(seconds=1), usegmt=True
+    )
+    response_cache.clear()
+
+    res = client.get(
+        f"/users/{user.id}", headers={**headers, "If-Modified-Since": last_modified}
+    )
+    assert res.status_code == 304
+    res = client.get(
+        f"/users/{user.id}", headers={**headers, "If-Modified-Since": earlier}
+    )
+    assert res.status_code == 200
+    # If-None-Match takes precedence over If-Modified-Since.
+    res = client.get(
+        f"/users/{user.id}",
+        headers={
+            **headers,
+            "If-None-Match": '"stale"',
+            "If-Modified-Since": last_modified,
+        },
+    )
+    assert res.status_code == 200
+
+
+def test_missing_user_is_404_with_preconditions(client, headers):
+    res = client.get("/users/999999", headers={**headers, "If-None-Match": '"1-0"'})
+    assert res.status_code == 404
+
+
+def test_collection_etag_tracks_inserts_and_deletes(client, headers, user, db_session):
+    res = client.get("/users/all", headers=headers)
+    etag = res.headers["ETag"]
+    conditional = {**headers, "If-None-Match": etag}
+    assert client.get("/users/all", headers=conditional).status_code == 304
+    response_cache.clear()
+    assert client.get("/users/all", headers=conditional).status_code == 304
+
+    # Each page has its own validator.
+    paged = client.get("/users/all?limit=1", headers=headers).headers["ETag"]
+    assert paged != etag
+
+    client.post(
+        "/users/create/",
+        json={
+            "first_name": "Another",
+            "last_name": "User",
+            "email": "another@etag.com",
+            "password": "password123",
+        },
+    )
+    res = client.get("/users/all", headers=conditional)
+    assert res.status_code == 200
+    after_insert = res.headers["ETag"]
+    assert after_insert != etag
+
+    db_session.delete(user)
+    db_session.flush()
+    response_cache.clear()
+    res = client.get("/users/all", headers={**headers, "If-None-Match": after_insert})
+    assert res.status_code == 200
+
+
+@pytest.mark.anyio
+async def test_async_user_etag_answers_304(async_client):
+    headers, _ = await authenticate_user_async(async_client)
+    user_id = (await async_client.get("/users/all", headers=headers)).json()["users"][
+        0
+    ]["id"]
+    res = await async_client.get(f"/users/{user_id}", headers=headers)
+    etag = res.headers["ETag"]
+    response_cache.clear()
+    res = await async_client.get(
+        f"/users/{user_id}", headers={**headers, "If-None-Match": etag}
+    )
+    assert res.status_code == 304
+
+    etag = (await async_client.get("/users/all", headers=headers)).headers["ETag"]
+    response_cache.clear()
+    res = await async_client.get(
+        "/users/all", headers={**headers, "If-None-Match": etag}
+    )
+    assert res.status_code == 304
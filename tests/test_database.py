@@ -57,7 +57,7 @@ def test_get_db_multiple_calls(monkeypatch):
         def close(self):
             calls.append("closed")
 
-    monkeypatch.setattr("app.database.db.SessionLocal", lambda: DummySession())
+    monkeypatch.setattr("app.database.db.get_sessionmaker", lambda: DummySession)
 
     for _ in range(3):
         gen = get_db()
@@ -0,0 +1,101 @@
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+from prometheus_client import REGISTRY
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+from app.cli.calibrate_argon2 import MIN_MEMORY_KIB, calibrate
+from app.database.models import UserModel
+from app.utils.hashing import ARGON2_PARAMS, PasswordHashExecutor, _hash, _verify
+from tests.factories import UserFactory
+
+
+def test_hash_executor_round_trip_in_worker_process():
+    executor = PasswordHashExecutor(workers=1, max_pending=4)
+    try:
+        hashed = executor.run("hash", _hash, "password123")
+        assert executor.run("verify", _verify, "password123", hashed)
+        assert not executor.run("verify", _verify, "wrong", hashed)
+    finally:
+        executor.shutdown()
+
+
+def test_hash_executor_rejects_when_queue_is_full():
+    executor = PasswordHashExecutor(workers=1, max_pending=1)
+    rejected = REGISTRY.get_sample_value("password_hash_rejected_total") or 0
+    try:
+        pending = executor.submit("sleep", time.sleep, 0.5)
+        with pytest.raises(HTTPException) as exc:
+            executor.submit("sleep", time.sleep, 0)
+        assert exc.value.status_code == 503
+        assert REGISTRY.get_sample_value("password_hash_rejected_total") == rejected + 1
+        pending.result()
+        executor.run("sleep", time.sleep, 0)
+    finally:
+        executor.shutdown()
+
+
+def test_hash_executor_inline_mode_records_latency():
+    executor = PasswordHashExecutor(workers=0, max_pending=1)
+    labels = {
+        "operation": "inline_test",
+        **{k: str(v) for k, v in ARGON2_PARAMS.items()},
+    }
+    before = REGISTRY.get_sample_value("password_hash_seconds_count", labels) or 0
+    assert executor.run("inline_test", len, "abc") == 3
+    assert (
+        REGISTRY.get_sample_value("password_hash_seconds_count", labels) == before + 1
+    )
+    assert REGISTRY.get_sample_value("password_hash_queue_depth") == 0
+
+
+@pytest.mark.anyio
+async def test_hash_executor_inline_mode_keeps_async_jobs_off_the_loop():
+    executor = PasswordHashExecutor(workers=0, max_pending=1)
+    labels = {
+        "operation": "inline_async_test",
+        **{k: str(v) for k, v in ARGON2_PARAMS.items()},
+    }
+    before = REGISTRY.get_sample_value("password_hash_seconds_count", labels) or 0
+    worker = await executor.run_async("inline_async_test", threading.current_thread)
+    assert worker is not threading.current_thread()
+    assert (
+        REGISTRY.get_sample_value("password_hash_seconds_count", labels) == before + 1
+    )
+    assert REGISTRY.get_sample_value("password_hash_queue_depth") == 0
+
+
+def test_login_upgrades_hash_made_with_old_parameters(client, db_session):
+    weak_hasher = Argon2Hasher(time_cost=1, memory_cost=MIN_MEMORY_KIB, parallelism=1)
+    user = UserFactory(
+        hashed_password=weak_hasher.hash("password123"), is_email_verified=True
+    )
+    db_session.commit()
+    labels = {k: str(v) for k, v in ARGON2_PARAMS.items()}
+    before = REGISTRY.get_sample_value("password_rehashed_total", labels) or 0
+
+    res = client.post(
+        "/login/", data={"username": user.email, "password": "password123"}
+    )
+    assert res.status_code == 200
+    stored = db_session.get(UserModel, user.id)
+    db_session.refresh(stored)
+    assert f"m={ARGON2_PARAMS['memory_cost']}" in stored.hashed_password
+    assert _verify("password123", stored.hashed_password)
+    assert REGISTRY.get_sample_value("password_rehashed_total", labels) == before + 1
+
+    res = client.post(
+        "/login/", data={"username": user.email, "password": "password123"}
+    )
+    assert res.status_code == 200
+    assert REGISTRY.get_sample_value("password_rehashed_total", labels) == before + 1
+
+
+def test_calibrate_shrinks_memory_to_meet_target():
+    result = calibrate(
+        target=0.000001, max_memory_kib=MIN_MEMORY_KIB * 4, parallelism=1, samples=1
+    )
+    assert result["memory_cost"] == MIN_MEMORY_KIB
+    assert result["time_cost"] == 1
@@ -0,0 +1,115 @@
+import csv
+import json
+
+from app.cli.import_users import import_users, read_rows
+from app.database.models import UserModel
+from app.utils.hashing import _verify
+from tests.factories import UserFactory
+
+
+def raw_connection(db_session):
+    return db_session.connection().connection.driver_connection
+
+
+def test_import_users_reports_conflicts(db_session):
+    existing = UserFactory()
+    db_session.flush()
+    local, domain = existing.email.split("@")
+    shouted = f"{local.upper()}@{domain}"
+    rows = [
+        (
+            2,
+            {
+                "first_name": "A",
+                "last_name": "One",
+                "email": "a@import.com",
+                "password": "pw-a",
+            },
+        ),
+        (
+            3,
+            {
+                "first_name": "B",
+                "last_name": "Two",
+                "email": "b@import.com",
+                "password": "pw-b",
+            },
+        ),
+        (
+            4,
+            {
+                "first_name": "A",
+                "last_name": "Again",
+                "email": "A@import.com",
+                "password": "x",
+            },
+        ),
+        (
+            5,
+            {
+                "first_name": "C",
+                "last_name": "Old",
+                "email": shouted,
+                "password": "x",
+            },
+        ),
+        (
+            6,
+            {
+                "first_name": "D",
+                "last_name": "Bad",
+                "email": "not-an-email",
+                "password": "x",
+            },
+        ),
+    ]
+    report = import_users(rows, raw_connection(db_session), workers=0, batch_size=2)
+
+    assert report.read == 5
+    assert report.inserted == 2
+    assert [line for line, _ in report.invalid] == [6]
+    # Rows are validated with RegisterUserSchema, which lowercases emails.
+    assert report.conflicts == [
+        (4, "a@import.com", "duplicate_in_file"),
+        (5, shouted.lower(), "already_exists"),
+    ]
+    imported = db_session.query(UserModel).filter_by(email="a@import.com").one()
+    assert imported.last_name == "One"
+    assert imported.token_version == 0
+    assert not imported.is_email_verified
+    assert _verify("pw-a", imported.hashed_password)
+
+
+def test_import_users_hashes_in_worker_processes(db_session, tmp_path):
+    path = tmp_path / "users.ndjson"
+    path.write_text(
+        "\n".join(
+            json.dumps(
+                {
+                    "first_name": "N",
+                    "last_name": str(i),
+                    "email": f"user{i}@ndjson.com",
+                    "password": f"pw{i}",
+                }
+            )
+            for i in range(4)
+        )
+    )
+    report = import_users(
+        read_rows(str(path)), raw_connection(db_session), workers=2, verified=True
+    )
+    assert report.inserted == 4
+    user = db_session.query(UserModel).filter_by(email="user3@ndjson.com").one()
+    assert user.is_email_verified
+    assert _verify("pw3", user.hashed_password)
+
+
+def test_read_rows_csv_line_numbers(tmp_path):
+    path = tmp_path / "users.csv"
+    with open(path, "w", newline="") as out:
+        writer = csv.writer(out)
+        writer.writerow(("first_name", "last_name", "email", "password"))
+        writer.writerow(("A", "B", "a@b.com", "pw"))
+    assert list(read_rows(str(path))) == [
+        (2, {"first_name": "A", "last_name": "B", "email": "a@b.com", "password": "pw"})
+    ]
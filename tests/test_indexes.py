@@ -0,0 +1,88 @@
+import json
+
+import pytest
+from sqlalchemy import select, text, update
+from sqlalchemy.dialects import postgresql
+
+from app.database.models import UserModel, user_email_is
+from app.routes.login import login_query
+from app.utils.otp_store import reset_password_statement
+from tests.factories import UserFactory
+from tests.test_users import authenticate_user
+
+
+def plan_indexes(db_session, statement) -> set[str]:
+    # Test tables hold a handful of rows, so seq scans are disabled to see
+    # which index the planner would use on a real table.
+    db_session.execute(text("SET LOCAL enable_seqscan = off"))
+    sql = statement.compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    )
+    plan = db_session.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    indexes = set()
+    nodes = [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if "Index Name" in node:
+            indexes.add(node["Index Name"])
+        nodes.extend(node.get("Plans", []))
+    return indexes
+
+
+@pytest.fixture
+def users(db_session):
+    users = UserFactory.create_batch(5)
+    db_session.flush()
+    return users
+
+
+def test_login_uses_uq_users_email_lower(db_session, users):
+    statement = login_query("Someone@Example.com")
+    assert plan_indexes(db_session, statement) == {"uq_users_email_lower"}
+
+
+def test_deactivated_user_token_is_rejected(client, db_session):
+    headers = authenticate_user(client)
+    db_session.execute(update(UserModel).values(is_active=False))
+    res = client.post(
+        "/login/",
+        data={"username": "testuser@example.com", "password": "password123"},
+    )
+    assert res.status_code == 200
+    token = res.json()["access_token"]
+    res = client.get("/users/all", headers={"Authorization": f"Bearer {token}"})
+    assert res.status_code == 401
+    assert client.get("/users/all", headers=headers).status_code == 401
+
+
+def test_email_lookup_uses_lower_email_index(db_session, users):
+    statement = select(UserModel.id).where(user_email_is("Someone@Example.com"))
+    assert plan_indexes(db_session, statement) == {"uq_users_email_lower"}
+
+
+def test_password_reset_update_uses_lower_email_index(db_session, users):
+    statement = reset_password_statement("Someone@Example.com", "hash")
+    assert "uq_users_email_lower" in plan_indexes(db_session, statement)
+
+
+def test_email_unique_ignores_case(client, users):
+    payload = {
+        "first_name": "Case",
+        "last_name": "Insensitive",
+        "email": users[0].email.upper(),
+        "password": "password123",
+    }
+    assert client.post("/users/create", json=payload).status_code == 409
+
+
+def test_login_and_otp_ignore_email_case(client):
+    # Registers, requests and verifies an OTP, and logs in as typed.
+    authenticate_user(client, email="Mixed.Case@Example.com")
+    res = client.post(
+        "/login/",
+        data={"username": "mixed.case@example.com", "password": "password123"},
+    )
+    assert res.status_code == 200
@@ -0,0 +1,23 @@
+from benchmarks.load import RouteStats, compare, percentile, summarize
+
+
+def test_percentiles_use_nearest_rank():
+    values = [i / 1000 for i in range(1, 101)]
+    assert percentile(values, 50) == 0.05
+    assert percentile(values, 95) == 0.095
+    assert percentile(values, 99) == 0.099
+    assert percentile([], 99) == 0.0
+
+
+def test_compare_flags_slower_routes():
+    fast = RouteStats(latencies=[0.01] * 100)
+    slow = RouteStats(latencies=[0.01] * 90 + [0.05] * 10)
+    baseline = summarize({"GET /users/{id}": fast}, elapsed=1.0)
+    current = summarize({"GET /users/{id}": slow}, elapsed=1.0)
+
+    assert compare(baseline, baseline, threshold=0.2) == []
+    regressions = compare(current, baseline, threshold=0.2)
+    assert regressions == [
+        "GET /users/{id} p95_ms 10.0 -> 50.0",
+        "GET /users/{id} p99_ms 10.0 -> 50.0",
+    ]
@@ -0,0 +1,52 @@
+import os
+import subprocess
+import sys
+
+from prometheus_client import CollectorRegistry
+from prometheus_client.multiprocess import MultiProcessCollector
+
+from app.utils.metrics import cleanup_dead_workers
+
+WORKER = """
+from prometheus_client import Counter, Gauge
+Counter("jobs", "Jobs handled").inc(3)
+Gauge("busy", "Busy workers", multiprocess_mode="livesum").set(1)
+"""
+
+
+def run_worker(path) -> None:
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(path)}
+    subprocess.run([sys.executable, "-c", WORKER], env=env, check=True)
+
+
+def collect(path) -> dict:
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry, path=str(path))
+    return {
+        sample.name: sample.value
+        for metric in registry.collect()
+        for sample in metric.samples
+    }
+
+
+def test_dead_workers_keep_counters_but_drop_live_gauges(tmp_path):
+    for _ in range(2):
+        run_worker(tmp_path)
+    assert collect(tmp_path) == {"jobs_total": 6.0, "busy": 2.0}
+
+    dead = cleanup_dead_workers(str(tmp_path))
+    assert len(dead) == 2
+    assert collect(tmp_path)["jobs_total"] == 6.0
+    assert "busy" not in collect(tmp_path)
+
+
+def test_live_workers_are_left_alone(tmp_path):
+    live = tmp_path / f"gauge_livesum_{os.getpid()}.db"
+    live.touch()
+    assert cleanup_dead_workers(str(tmp_path)) == []
+    assert live.exists()
+
+
+def test_cleanup_is_a_no_op_without_multiprocess_dir(monkeypatch):
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+    assert cleanup_dead_workers() == []
@@ -0,0 +1,18 @@
+from app.utils import login_util
+from benchmarks.micro import GROUPS, compare
+
+
+def test_every_case_runs():
+    token_cache = login_util.token_cache
+    try:
+        for group in GROUPS:
+            for name, size, build in group():
+                build()()
+    finally:
+        login_util.token_cache = token_cache
+
+
+def test_compare_reports_percentage_change():
+    before = {"cases": {"a[-]": {"per_op_us": 10.0}, "gone[-]": {"per_op_us": 1.0}}}
+    after = {"cases": {"a[-]": {"per_op_us": 12.5}}}
+    assert compare(before, after) == [("a[-]", 10.0, 12.5, 25.0)]
@@ -0,0 +1,68 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from app.middleware.middleware import RequestMiddleware
+
+
+def build_app(rate_limiter=None) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RequestMiddleware, rate_limiter=rate_limiter)
+
+    @app.get("/boom")
+    def boom():
+        raise RuntimeError("boom")
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(
+            (f"chunk{i}\n".encode() for i in range(3)), media_type="text/plain"
+        )
+
+    return app
+
+
+@pytest.fixture
+async def middleware_client():
+    transport = httpx.ASGITransport(app=build_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+
+
+def test_root_has_timing_headers(client):
+    res = client.get("/")
+    assert res.status_code == 200
+    assert res.headers["X-Process-Time"].endswith("s")
+    assert res.headers["X-DB-Statements"] == "0"
+
+
+@pytest.mark.anyio
+async def test_unhandled_error_becomes_500(middleware_client):
+    res = await middleware_client.get("/boom")
+    assert res.status_code == 500
+    assert res.json() == {"message": "Something went wrong"}
+
+
+@pytest.mark.anyio
+async def test_streaming_response_passes_through(middleware_client):
+    async with middleware_client.stream("GET", "/stream") as res:
+        assert "X-Process-Time" in res.headers
+        # Counts would be partial while the body is still being produced.
+        assert "X-DB-Statements" not in res.headers
+        chunks = [chunk async for chunk in res.aiter_lines()]
+    assert chunks == ["chunk0", "chunk1", "chunk2"]
+
+
+class DenyAll:
+    async def hit(self, _key):
+        return False
+
+
+@pytest.mark.anyio
+async def test_rate_limited_requests_get_429():
+    transport = httpx.ASGITransport(app=build_app(rate_limiter=DenyAll()))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        res = await c.get("/stream")
+    assert res.status_code == 429
+    assert res.json() == {"detail": "Too many requests"}
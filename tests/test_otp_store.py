@@ -0,0 +1,191 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import fakeredis
+import pytest
+
+from app.core.enums import OTPPurpose
+from app.core.messages import Message
+from app.utils import otp_store as otp_store_module
+from app.utils.otp_store import (
+    DatabaseOTPStore,
+    MemoryOTPStore,
+    OTPRecord,
+    OTPStore,
+    RedisOTPStore,
+)
+from tests.factories import UserFactory
+from tests.test_users import authenticate_user
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(otp_store_module, "get_redis", lambda: client)
+    return client
+
+
+@pytest.fixture(params=["memory", "redis", "database"])
+def store(request, monkeypatch):
+    if request.param == "memory":
+        store = MemoryOTPStore(maxsize=100)
+    elif request.param == "redis":
+        request.getfixturevalue("fake_redis")
+        store = RedisOTPStore()
+    else:
+        store = DatabaseOTPStore()
+    for module in ("user_service", "async_user_service"):
+        monkeypatch.setattr(f"app.services.{module}.otp_store", store)
+    return store
+
+
+@pytest.fixture
+def user(db_session):
+    user = UserFactory(email="otp@example.com")
+    db_session.flush()
+    return user
+
+
+def make_record(**changes):
+    now = datetime.now(timezone.utc)
+    values = dict(
+        email="otp@example.com",
+        otp="123456",
+        purpose=OTPPurpose.FORGOT_PASSWORD.value,
+        otp_expiry=now + timedelta(minutes=5),
+    )
+    return OTPRecord(**{**values, **changes})
+
+
+def test_store_round_trip(store, db_session):
+    record = make_record()
+    store.save(record, db_session)
+    assert store.get(record.email, db_session) == record
+
+    store.delete(record.email, db_session)
+    assert store.get(record.email, db_session) is None
+
+
+def test_store_verify_redeems_once(store, db_session, user):
+    now = datetime.now(timezone.utc)
+    store.save(make_record(purpose=OTPPurpose.EMAIL_VERIFICATION.value), db_session)
+    assert store.verify("otp@example.com", "000000", now, db_session) is None
+    purpose = store.verify("otp@example.com", "123456", now, db_session)
+    assert purpose == OTPPurpose.EMAIL_VERIFICATION.value
+    assert store.verify("otp@example.com", "123456", now, db_session) is None
+    assert store.get("otp@example.com", db_session) is None
+
+
+def test_store_reset_requires_verified_code(store, db_session, user):
+    now = datetime.now(timezone.utc)
+    store.save(make_record(), db_session)
+    assert store.reset_password("otp@example.com", "hash", now, db_session) is None
+    assert store.verify("otp@example.com", "123456", now, db_session)
+    assert store.get("otp@example.com", db_session).is_verified
+    assert store.reset_password("otp@example.com", "hash", now, db_session) == user.id
+    assert store.reset_password("otp@example.com", "hash", now, db_session) is None
+    assert store.get("otp@example.com", db_session) is None
+
+
+def test_store_verify_keeps_code_without_user(store, db_session):
+    now = datetime.now(timezone.utc)
+    record = make_record(purpose=OTPPurpose.EMAIL_VERIFICATION.value)
+    store.save(record, db_session)
+    assert store.verify("otp@example.com", "123456", now, db_session) is None
+    assert store.get("otp@example.com", db_session) == record
+
+
+def test_record_ttl_covers_reset_window():
+    now = datetime.now(timezone.utc)
+    pending = make_record(otp_expiry=now + timedelta(minutes=5))
+    assert pending.ttl(now) == timedelta(minutes=15).total_seconds()
+    verified = make_record(is_verified=True, verified_at=now)
+    assert verified.ttl(now) == timedelta(minutes=20).total_seconds()
+    stale = make_record(otp_expiry=now - timedelta(minutes=30))
+    assert stale.ttl(now) < 0
+
+
+def test_incomplete_store_fails_on_instantiation():
+    class NoDelete(OTPStore):
+        def get(self, email, db):
+            return None
+
+        def save(self, record, db):
+            pass
+
+    with pytest.raises(TypeError, match="delete"):
+        NoDelete()
+
+
+def test_redis_store_sets_key_expiry(fake_redis):
+    record = make_record()
+    RedisOTPStore().save(record, None)
+    ttl = fake_redis.pttl(f"otp:{record.email}")
+    assert timedelta(minutes=14) < timedelta(milliseconds=ttl) <= timedelta(minutes=15)
+
+
+def test_memory_store_drops_stale_records():
+    store = MemoryOTPStore(maxsize=100)
+    store.save(make_record(otp_expiry=datetime.now(timezone.utc) - timedelta(hours=1)))
+    assert store.get("otp@example.com") is None
+
+
+def test_forgot_password_flow(client, store):
+    email = "testuser@example.com"
+    authenticate_user(client, email=email)
+    with patch("app.services.user_service.generate_otp", return_value="654321"):
+        res = client.post(
+            "/users/otp/request/",
+            json={"email": email, "purpose": OTPPurpose.FORGOT_PASSWORD.value},
+        )
+    assert res.status_code == 200
+    res = client.post(
+        "/users/otp/request/",
+        json={"email": email, "purpose": OTPPurpose.FORGOT_PASSWORD.value},
+    )
+    assert res.status_code == 409
+
+    payload = {"email": email, "new_password": "newpassword123"}
+    assert client.patch("/users/forgot-password", json=payload).status_code == 403
+    res = client.post("/users/otp/verify/", json={"email": email, "otp": "000000"})
+    assert res.status_code == 400
+    res = client.post("/users/otp/verify/", json={"email": email, "otp": "654321"})
+    assert res.status_code == 200
+
+    res = client.patch("/users/forgot-password", json=payload)
+    assert res.status_code == 200
+    assert client.patch("/users/forgot-password", json=payload).status_code == 403
+    res = client.post(
+        "/login/", data={"username": email, "password": payload["new_password"]}
+    )
+    assert res.status_code == 200
+
+
+def test_forgot_password_window_expired(client, store, db_session):
+    email = "testuser@example.com"
+    authenticate_user(client, email=email)
+    verified_at = datetime.now(timezone.utc) - timedelta(minutes=11)
+    store.save(
+        make_record(email=email, is_verified=True, verified_at=verified_at),
+        db_session,
+    )
+    payload = {"email": email, "new_password": "newpassword123"}
+    res = client.patch("/users/forgot-password", json=payload)
+    assert res.status_code == 410
+    assert store.get(email, db_session) is None
+
+
+def test_verify_otp_for_deleted_user(client, store, db_session, user):
+    with patch("app.services.user_service.generate_otp", return_value="654321"):
+        client.post(
+            "/users/otp/request/",
+            json={
+                "email": user.email,
+                "purpose": OTPPurpose.EMAIL_VERIFICATION.value,
+            },
+        )
+    db_session.delete(user)
+    db_session.flush()
+    res = client.post("/users/otp/verify/", json={"email": user.email, "otp": "654321"})
+    assert res.status_code == 404
+    assert res.json()["detail"] == Message.USER_DOES_NOT_EXIST.value
@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta, timezone
+
+from prometheus_client import REGISTRY
+from sqlalchemy import delete, insert, select
+
+from app.database.models import OTPModel
+from app.utils.otp_sweeper import OTPSweeper, sweep_batch
+
+NOW = datetime.now(timezone.utc)
+
+
+def otp_row(email, expiry, created_at=NOW, is_verified=False):
+    # executemany takes its columns from the first row, so every row sets all.
+    return {
+        "email": email,
+        "otp": "123456",
+        "otp_expiry": expiry,
+        "created_at": created_at,
+        "is_verified": is_verified,
+    }
+
+
+def remaining(connection):
+    return set(connection.execute(select(OTPModel.email)).scalars())
+
+
+def test_sweep_batch_deletes_only_stale_rows(db_session):
+    connection = db_session.connection()
+    connection.execute(
+        insert(OTPModel),
+        [
+            otp_row("stale@otp.com", NOW - timedelta(hours=1)),
+            otp_row("pending@otp.com", NOW + timedelta(minutes=5)),
+            # Expired, but the service can still answer "expired" for it.
+            otp_row("recent@otp.com", NOW - timedelta(minutes=5)),
+            otp_row("verified@otp.com", NOW - timedelta(minutes=15), is_verified=True),
+            otp_row("abandoned@otp.com", None, created_at=NOW - timedelta(days=1)),
+        ],
+    )
+    assert sweep_batch(connection, NOW, batch_size=10, timeout=5) == 2
+    assert remaining(connection) == {
+        "pending@otp.com",
+        "recent@otp.com",
+        "verified@otp.com",
+    }
+
+
+def test_sweep_batch_is_bounded(db_session):
+    connection = db_session.connection()
+    connection.execute(
+        insert(OTPModel),
+        [otp_row(f"{i}@otp.com", NOW - timedelta(hours=1)) for i in range(5)],
+    )
+    assert sweep_batch(connection, NOW, batch_size=2, timeout=5) == 2
+    assert len(remaining(connection)) == 3
+
+
+def test_sweeper_skips_rows_locked_by_other_workers(engine):
+    emails = [f"locked{i}@otp.com" for i in range(3)]
+    with engine.begin() as connection:
+        connection.execute(
+            insert(OTPModel),
+            [otp_row(email, NOW - timedelta(hours=1)) for email in emails],
+        )
+    purged_before = REGISTRY.get_sample_value("otp_rows_purged_total") or 0
+    runs_before = REGISTRY.get_sample_value("otp_sweep_seconds_count") or 0
+    sweeper = OTPSweeper(
+        engine=engine, interval=60, batch_size=1, batch_timeout=5, max_batches=10
+    )
+    try:
+        with engine.begin() as other_worker:
+            other_worker.execute(
+                select(OTPModel.id).where(OTPModel.email == emails[0]).with_for_update()
+            )
+            assert sweeper.sweep(NOW) == 2
+        with engine.connect() as connection:
+            assert remaining(connection) == {emails[0]}
+    finally:
+        with engine.begin() as connection:
+            connection.execute(delete(OTPModel).where(OTPModel.email.in_(emails)))
+
+    assert REGISTRY.get_sample_value("otp_rows_purged_total") == purged_before + 2
+    assert REGISTRY.get_sample_value("otp_sweep_seconds_count") == runs_before + 1
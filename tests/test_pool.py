@@ -0,0 +1,50 @@
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, exc
+
+from app.database.pool import InstrumentedQueuePool
+from tests.conftest import TEST_DATABASE_URL
+
+
+def sample(name, pool="pool_test"):
+    return REGISTRY.get_sample_value(name, {"pool": pool}) or 0
+
+
+def test_pool_metrics_track_checkout_and_timeouts():
+    engine = create_engine(
+        TEST_DATABASE_URL,
+        poolclass=InstrumentedQueuePool,
+        pool_logging_name="pool_test",
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    timeouts_before = sample("db_pool_checkout_timeouts_total")
+    waits_before = sample("db_pool_checkout_wait_seconds_count")
+
+    conn = engine.connect()
+    assert sample("db_pool_checked_out") == 1
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    assert sample("db_pool_checkout_timeouts_total") == timeouts_before + 1
+    assert sample("db_pool_checkout_wait_seconds_count") == waits_before + 2
+
+    conn.close()
+    assert sample("db_pool_checked_out") == 0
+    engine.dispose()
+
+
+def test_pool_metrics_report_overflow():
+    engine = create_engine(
+        TEST_DATABASE_URL,
+        poolclass=InstrumentedQueuePool,
+        pool_logging_name="overflow_test",
+        pool_size=1,
+        max_overflow=1,
+    )
+    first, second = engine.connect(), engine.connect()
+    assert sample("db_pool_overflow", pool="overflow_test") == 1
+    first.close()
+    second.close()
+    assert sample("db_pool_overflow", pool="overflow_test") == 0
+    engine.dispose()
@@ -0,0 +1,97 @@
+import time
+
+import fakeredis
+
+from app.config.config import setting
+from app.middleware.middleware import (
+    USER_CACHE_KEY,
+    USERS_CACHE_KEY,
+    invalidate_user_cache,
+    response_cache,
+)
+from app.utils import principal_cache as principal_module
+from app.utils.principal_cache import (
+    Principal,
+    PrincipalInvalidationListener,
+    principal_cache,
+)
+from tests.test_users import authenticate_user
+
+
+def test_principal_cached_and_revoked_on_password_change(client):
+    headers = authenticate_user(client)
+    assert client.get("/users/all", headers=headers).status_code == 200
+    user_id = client.get("/users/all", headers=headers).json()["users"][0]["id"]
+    cached = principal_cache.get(user_id)
+    assert cached is not None
+    assert cached.is_active
+
+    res = client.patch(
+        "/users/update-password",
+        json={"old_password": "password123", "new_password": "newpassword123"},
+        headers=headers,
+    )
+    assert res.status_code == 202
+    assert principal_cache.get(user_id) is None
+    assert client.get("/users/all", headers=headers).status_code == 401
+
+
+def test_listener_drops_principals_published_by_other_workers(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        principal_module, "get_redis", lambda: fakeredis.FakeRedis(server=server)
+    )
+    listener = PrincipalInvalidationListener(channel="test-invalidation")
+    publisher = fakeredis.FakeRedis(server=server)
+    listener.start()
+    try:
+        deadline = time.monotonic() + 2
+        while (
+            publisher.pubsub_numsub("test-invalidation")[0][1] == 0
+            and time.monotonic() < deadline
+        ):
+            time.sleep(0.01)
+        principal_cache.set(42, Principal(id=42, token_version=0, is_active=True))
+        publisher.publish("test-invalidation", "42")
+        deadline = time.monotonic() + 2
+        while principal_cache.get(42) is not None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert principal_cache.get(42) is None
+    finally:
+        listener.stop()
+
+
+def test_listener_ignores_malformed_messages():
+    principal_cache.set(7, Principal(id=7, token_version=0, is_active=True))
+    principal_cache.set(8, Principal(id=8, token_version=0, is_active=True))
+    PrincipalInvalidationListener.handle(b"7,abc,")
+    assert principal_cache.get(7) is None
+    assert principal_cache.get(8) is not None
+
+
+def test_user_cache_invalidation_is_published(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        principal_module, "get_redis", lambda: fakeredis.FakeRedis(server=server)
+    )
+    monkeypatch.setattr(setting, "principal_invalidation_pubsub", True)
+    pubsub = fakeredis.FakeRedis(server=server).pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(setting.principal_invalidation_channel)
+    invalidate_user_cache(5, 6)
+    deadline = time.monotonic() + 2
+    message = None
+    while message is None and time.monotonic() < deadline:
+        message = pubsub.get_message(timeout=0.01)
+    assert message["data"] == b"response:5,6"
+
+
+def test_listener_drops_responses_published_by_other_workers():
+    principal_cache.set(5, Principal(id=5, token_version=0, is_active=True))
+    response_cache.set((USER_CACHE_KEY, 5), (b"{}", None))
+    response_cache.set((USER_CACHE_KEY, 6), (b"{}", None))
+    response_cache.set((USERS_CACHE_KEY, 0, 10), (b"{}", None))
+    PrincipalInvalidationListener.handle(b"response:5")
+    assert response_cache.get((USER_CACHE_KEY, 5)) is None
+    assert response_cache.get((USERS_CACHE_KEY, 0, 10)) is None
+    assert response_cache.get((USER_CACHE_KEY, 6)) is not None
+    assert principal_cache.get(5) is not None
@@ -0,0 +1,72 @@
+import logging
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.config.config import setting
+from app.database.query_stats import QueryStats, observe_query_stats, track_queries
+
+CREATE = {
+    "first_name": "Query",
+    "last_name": "Stats",
+    "email": "query@stats.com",
+    "password": "password123",
+}
+
+
+def statements_observed(handler):
+    labels = {"method": "POST", "handler": handler}
+    return REGISTRY.get_sample_value("db_request_statements_count", labels) or 0
+
+
+def test_sql_stats_headers_and_histograms(client):
+    before = statements_observed("/users/create")
+    res = client.post("/users/create", json=CREATE)
+    assert res.status_code == 201
+    assert res.headers["X-DB-Statements"] == "1"
+    assert float(res.headers["X-DB-Time"].rstrip("s")) > 0
+    assert statements_observed("/users/create") == before + 1
+
+    res = client.get("/")
+    assert res.headers["X-DB-Statements"] == "0"
+
+
+@pytest.mark.anyio
+async def test_sql_stats_count_async_statements(async_client):
+    with track_queries() as stats:
+        res = await async_client.post("/users/create", json=CREATE)
+    assert res.status_code == 201
+    # The test session turns commit() into SAVEPOINT/RELEASE, counted as well.
+    inserts = [shape for shape in stats.shapes if shape.startswith("INSERT")]
+    assert len(inserts) == 1
+    assert stats.seconds > 0
+
+
+def test_query_stats_group_statement_shapes():
+    stats = QueryStats()
+    for _ in range(3):
+        stats.record("SELECT * FROM users WHERE id = %(id)s", 0.001)
+    stats.record("SELECT 1", 0.001)
+    assert stats.statements == 4
+    assert stats.repeated(3) == [("SELECT * FROM users WHERE id = %(id)s", 3)]
+
+
+def test_sql_debug_warns_about_loops(monkeypatch, caplog):
+    monkeypatch.setattr(setting, "sql_debug", True)
+    monkeypatch.setattr(setting, "sql_debug_max_statements", 3)
+    monkeypatch.setattr(setting, "sql_debug_max_repeats", 3)
+    stats = QueryStats()
+    for _ in range(4):
+        stats.record("SELECT * FROM otp WHERE email = %(email)s", 0.001)
+
+    with caplog.at_level(logging.WARNING, logger="api"):
+        observe_query_stats(stats, "GET", "/users/all")
+    messages = [record.getMessage() for record in caplog.records]
+    assert any("ran 4 SQL statements" in message for message in messages)
+    assert any("possible N+1" in message for message in messages)
+
+    caplog.clear()
+    monkeypatch.setattr(setting, "sql_debug", False)
+    with caplog.at_level(logging.WARNING, logger="api"):
+        observe_query_stats(stats, "GET", "/users/all")
+    assert not caplog.records
@@ -1,5 +1,11 @@
+import time
+
 import pytest
+from fakeredis import FakeAsyncRedis
+from redis.asyncio import Redis
+
 from app.core.enums import OTPPurpose
+from app.middleware.rate_limit import RedisRateLimiter, SlidingWindowRateLimiter
 
 
 def create_user(client, email):
@@ -30,3 +36,92 @@ def test_otp_rate_limit(client):
     # If rate limit exists
     assert res.status_code in (200, 429, 409)
 
+
+
+def test_sliding_window_limits_within_window():
+    limiter = SlidingWindowRateLimiter(limit=3, window=60, max_clients=10)
+    assert [limiter.allow("a", now=0.0 + i) for i in range(4)] == [
+        True,
+        True,
+        True,
+        False,
+    ]
+    assert limiter.allow("b", now=5.0)
+
+
+def test_sliding_window_weights_previous_window():
+    limiter = SlidingWindowRateLimiter(limit=10, window=60, max_clients=10)
+    for _ in range(10):
+        assert limiter.allow("a", now=30.0)
+    # Half of the previous window still overlaps: 10 * 0.5 = 5 slots used.
+    allowed = sum(limiter.allow("a", now=90.0) for _ in range(10))
+    assert allowed == 5
+    # Two windows later the old counts no longer matter.
+    assert limiter.allow("a", now=240.0)
+
+
+def test_sliding_window_memory_is_bounded():
+    limiter = SlidingWindowRateLimiter(limit=1, window=60, max_clients=3)
+    for i in range(10):
+        limiter.allow(f"client-{i}", now=1.0)
+    assert len(limiter) == 3
+    # The evicted client starts from scratch.
+    assert limiter.allow("client-0", now=1.0)
+
+
+def test_sliding_window_drops_idle_clients():
+    limiter = SlidingWindowRateLimiter(limit=5, window=60, max_clients=100)
+    limiter.allow("idle", now=0.0)
+    limiter.allow("fresh", now=200.0)
+    assert len(limiter) == 1
+    limiter.clear()
+    assert len(limiter) == 0
+
+
+@pytest.mark.anyio
+async def test_redis_limiter_shares_counters_between_workers():
+    client = FakeAsyncRedis()
+    workers = [
+        RedisRateLimiter(
+            client=client,
+            limit=3,
+            window=60,
+            fallback=SlidingWindowRateLimiter(limit=3, window=60, max_clients=10),
+            retry_after=5,
+        )
+        for _ in range(2)
+    ]
+    results = [await workers[i % 2].hit("10.0.0.1") for i in range(4)]
+    assert results == [True, True, True, False]
+    assert await workers[0].hit("10.0.0.2")
+
+
+@pytest.mark.anyio
+async def test_redis_limiter_counts_the_previous_window():
+    client = FakeAsyncRedis()
+    limiter = RedisRateLimiter(
+        client=client,
+        limit=3,
+        window=60,
+        fallback=SlidingWindowRateLimiter(limit=3, window=60, max_clients=10),
+        retry_after=5,
+    )
+    window_start = int(time.time() // 60 * 60)
+    await client.set(f"rate_limit:{{10.0.0.1}}:{window_start - 60}", 1000)
+    assert not await limiter.hit("10.0.0.1")
+    assert await limiter.hit("10.0.0.2")
+
+
+@pytest.mark.anyio
+async def test_redis_limiter_falls_back_to_local_limiter():
+    fallback = SlidingWindowRateLimiter(limit=2, window=60, max_clients=10)
+    limiter = RedisRateLimiter(
+        client=Redis(port=1, socket_connect_timeout=0.1),
+        limit=2,
+        window=60,
+        fallback=fallback,
+        retry_after=60,
+    )
+    results = [await limiter.hit("10.0.0.1") for _ in range(3)]
+    assert results == [True, True, False]
+    assert len(fallback) == 1
@@ -0,0 +1,114 @@
+from unittest.mock import patch
+
+import pytest
+
+from app.core.enums import OTPPurpose
+from tests.factories import UserFactory
+from tests.test_users import authenticate_user
+
+PASSWORD = {"old_password": "password123", "new_password": "newpassword123"}
+
+
+@pytest.fixture
+def headers(client):
+    headers = authenticate_user(client)
+    # Loads the principal into its cache so auth adds no statements below.
+    client.get("/users/all", headers=headers)
+    return headers
+
+
+def count(statements, send, *args, **kwargs):
+    statements.clear()
+    res = send(*args, **kwargs)
+    assert res.status_code < 400, res.text
+    return len(statements)
+
+
+def test_create_user_is_one_statement(client, statements):
+    payload = {
+        "first_name": "One",
+        "last_name": "Trip",
+        "email": "one@trip.com",
+        "password": "password123",
+    }
+    assert count(statements, client.post, "/users/create/", json=payload) == 1
+    statements.clear()
+    assert client.post("/users/create/", json=payload).status_code == 409
+    assert len(statements) == 1
+
+
+def test_update_user_is_one_statement(client, headers, statements):
+    details = {"first_name": "Single", "last_name": "Statement"}
+    assert (
+        count(
+            statements,
+            client.put,
+            "/users/update-detail",
+            json=details,
+            headers=headers,
+        )
+        == 1
+    )
+
+
+def test_update_password_reads_hash_then_compare_and_sets(client, headers, statements):
+    assert (
+        count(
+            statements,
+            client.patch,
+            "/users/update-password",
+            json=PASSWORD,
+            headers=headers,
+        )
+        == 2
+    )
+
+
+def test_delete_user_statements(client, db_session, headers, statements):
+    user_id = UserFactory().id
+    db_session.commit()
+    assert (
+        count(statements, client.delete, f"/users/delete/{user_id}", headers=headers)
+        == 2
+    )
+
+
+def test_otp_verification_and_reset_statements(client, statements):
+    email = "testuser@example.com"
+    authenticate_user(client, email=email)
+    with patch("app.services.user_service.generate_otp", return_value="654321"):
+        client.post(
+            "/users/otp/request/",
+            json={"email": email, "purpose": OTPPurpose.FORGOT_PASSWORD.value},
+        )
+
+    verify = {"email": email, "otp": "654321"}
+    assert count(statements, client.post, "/users/otp/verify/", json=verify) == 1
+
+    reset = {"email": email, "new_password": "newpassword123"}
+    assert count(statements, client.patch, "/users/forgot-password", json=reset) == 1
+    # The reset consumed the code.
+    assert client.patch("/users/forgot-password", json=reset).status_code == 403
+
+
+def test_email_verification_code_is_single_use(client, statements):
+    email = "testuser@example.com"
+    client.post(
+        "/users/create/",
+        json={
+            "first_name": "Test",
+            "last_name": "User",
+            "email": email,
+            "password": "password123",
+        },
+    )
+    with patch("app.services.user_service.generate_otp", return_value="123456"):
+        client.post(
+            "/users/otp/request/",
+            json={"email": email, "purpose": OTPPurpose.EMAIL_VERIFICATION.value},
+        )
+    verify = {"email": email, "otp": "123456"}
+    assert count(statements, client.post, "/users/otp/verify/", json=verify) == 1
+    assert client.post("/users/otp/verify/", json=verify).status_code == 404
+    res = client.post("/login/", data={"username": email, "password": "password123"})
+    assert res.status_code == 200
@@ -0,0 +1,27 @@
+import os
+import subprocess
+import sys
+
+from benchmarks.startup import measure
+
+# Wall time from spawning `python -c 'import main'` to the first served
+# request. Override on slow CI machines rather than loosening the test.
+STARTUP_BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", "3.0"))
+
+DEFERRED = ("uvicorn", "redis", "psycopg2", "asyncpg")
+
+
+def test_first_request_within_startup_budget():
+    result = measure()
+    assert result["first_request_seconds"] <= STARTUP_BUDGET_SECONDS, result
+
+
+def test_importing_main_defers_drivers_and_server():
+    code = (
+        "import sys, main; "
+        f"print(','.join(m for m in {DEFERRED!r} if m in sys.modules))"
+    )
+    imported = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout.strip()
+    assert imported == ""
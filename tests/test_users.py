@@ -1,5 +1,13 @@
 import pytest
-from app.schemas.response import ResponseUserSchema, UsersSchema
+from prometheus_client import REGISTRY
+
+from app.core.constants import USERS_BATCH_MAX_IDS
+from app.schemas.response import (
+    BatchResultSchema,
+    BatchUsersSchema,
+    ResponseUserSchema,
+    UsersSchema,
+)
 from app.schemas.request import RegisterUserSchema
 from tests.factories import UserFactory
 
@@ -86,6 +94,64 @@ def test_get_all_users(client, db_session):
     assert len(validated.users) == 5 + 1
 
 
+def test_get_all_users_pagination(client, db_session):
+    UserFactory.create_batch(5)
+    db_session.commit()
+    headers = authenticate_user(client)
+    seen = []
+    after = None
+    while True:
+        params = {"limit": 2}
+        if after:
+            params["after"] = after
+        res = client.get("/users/all", params=params, headers=headers)
+        assert res.status_code == 200
+        page = UsersSchema.model_validate(res.json())
+        assert len(page.users) <= 2
+        seen.extend(user.id for user in page.users)
+        after = page.next_cursor
+        if after is None:
+            break
+    assert len(seen) == 5 + 1
+    assert seen == sorted(seen)
+
+
+@pytest.mark.parametrize(
+    "params,expected_status",
+    [
+        ({"after": "not-a-cursor"}, 400),
+        ({"limit": 0}, 422),
+        ({"limit": 10_000}, 422),
+    ],
+)
+def test_get_all_users_invalid_page(client, params, expected_status):
+    headers = authenticate_user(client)
+    res = client.get("/users/all", params=params, headers=headers)
+    assert res.status_code == expected_status
+
+
+def test_export_users_ndjson(client, db_session):
+    UserFactory.create_batch(3)
+    db_session.commit()
+    headers = authenticate_user(client)
+    res = client.get("/users/export", headers=headers)
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("application/x-ndjson")
+    users = [ResponseUserSchema.model_validate_json(line) for line in res.iter_lines()]
+    assert len(users) == 3 + 1
+
+
+def test_export_users_csv(client, db_session):
+    UserFactory.create_batch(3)
+    db_session.commit()
+    headers = authenticate_user(client)
+    res = client.get("/users/export", params={"format": "csv"}, headers=headers)
+    assert res.status_code == 200
+    lines = res.text.splitlines()
+    assert lines[0] == "id,first_name,last_name,email"
+    assert len(lines) == 1 + 3 + 1
+
+
 def test_get_user_by_id(client, db_session):
     user = UserFactory()
     db_session.commit()
@@ -97,6 +163,82 @@ def test_get_user_by_id(client, db_session):
     assert validated.email == user.email
 
 
+def test_get_user_cached_until_updated(client):
+    headers = authenticate_user(client)
+    user_id = UsersSchema.model_validate(
+        client.get("/users/all", headers=headers).json()
+    ).users[0].id
+    hits = REGISTRY.get_sample_value("cache_hits_total", {"cache": "response"}) or 0
+
+    first = client.get(f"/users/{user_id}", headers=headers)
+    second = client.get(f"/users/{user_id}", headers=headers)
+    assert first.json() == second.json()
+    assert REGISTRY.get_sample_value("cache_hits_total", {"cache": "response"}) == hits + 1
+
+    client.put(
+        "/users/update-detail",
+        json={"first_name": "Cached", "last_name": "Busted"},
+        headers=headers,
+    )
+    res = client.get(f"/users/{user_id}", headers=headers)
+    assert res.json()["first_name"] == "Cached"
+    listed = client.get("/users/all", headers=headers).json()["users"]
+    assert listed[0]["first_name"] == "Cached"
+
+
+def test_get_users_batch(client, db_session):
+    users = UserFactory.create_batch(3)
+    db_session.commit()
+    headers = authenticate_user(client)
+    ids = [users[2].id, users[0].id, 999999, users[0].id]
+    res = client.post("/users/batch", json={"ids": ids}, headers=headers)
+    assert res.status_code == 200
+    batch = BatchUsersSchema.model_validate(res.json())
+    assert [user.id for user in batch.users] == sorted([users[0].id, users[2].id])
+    assert batch.missing == [999999]
+
+
+@pytest.mark.parametrize("size", [0, USERS_BATCH_MAX_IDS + 1])
+def test_users_batch_size_capped(client, size):
+    headers = authenticate_user(client)
+    ids = list(range(1, size + 1))
+    for path in ("/users/batch", "/users/batch/deactivate", "/users/batch/delete"):
+        res = client.post(path, json={"ids": ids}, headers=headers)
+        assert res.status_code == 422
+
+
+def test_deactivate_users_revokes_tokens(client):
+    headers = authenticate_user(client)
+    other = authenticate_user(client, email="other@example.com")
+    other_id = client.get("/users/all", headers=headers).json()["users"][1]["id"]
+    assert client.get(f"/users/{other_id}", headers=other).status_code == 200
+
+    res = client.post(
+        "/users/batch/deactivate", json={"ids": [other_id, 999999]}, headers=headers
+    )
+    assert res.status_code == 200
+    assert BatchResultSchema.model_validate(res.json()).ids == [other_id]
+    assert client.get(f"/users/{other_id}", headers=other).status_code == 401
+    assert client.get(f"/users/{other_id}", headers=headers).status_code == 200
+
+    res = client.post(
+        "/users/batch/deactivate", json={"ids": [other_id]}, headers=headers
+    )
+    assert res.json()["ids"] == []
+
+
+def test_delete_users_batch(client, db_session):
+    users = UserFactory.create_batch(2)
+    db_session.commit()
+    headers = authenticate_user(client)
+    ids = [user.id for user in users]
+    res = client.post("/users/batch/delete", json={"ids": ids}, headers=headers)
+    assert res.status_code == 200
+    assert res.json()["ids"] == sorted(ids)
+    # Same as the single delete: the caller's own token is rotated too.
+    assert client.get(f"/users/{ids[0]}", headers=headers).status_code == 401
+
+
 def test_get_user_not_found(client):
     headers = authenticate_user(client)
     res = client.get("/users/999999", headers=headers)
@@ -104,12 +246,12 @@ def test_get_user_not_found(client):
 
 
 def test_delete_user(client, db_session):
-    user = UserFactory()
+    user_id = UserFactory().id
     db_session.commit()
     headers = authenticate_user(client)
-    res = client.delete(f"/users/delete/{user.id}", headers=headers)
+    res = client.delete(f"/users/delete/{user_id}", headers=headers)
     assert res.status_code == 204
-    check = client.get(f"/users/{user.id}", headers=headers)
+    check = client.get(f"/users/{user_id}", headers=headers)
     assert check.status_code == 401
 
 